@@ -1,41 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
+import asyncio
+import json
+import re
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+from datetime import datetime
 
-from app.database import get_db
-from app import crud, schemas
+from app.database import AsyncSessionLocal
+from app import crud, models, schemas
 from app.services.ai_agent import ai_agent
+from app.services.keyword_matcher import KeywordMatcher
 
 router = APIRouter()
 
-# System prompt for the learning assistant
+# System prompt for the learning assistant. Sent as the first message on every
+# call, so keep it static: any per-request text here defeats prefix caching.
 SYSTEM_PROMPT = """You are a helpful learning assistant that helps users navigate their personalized learning path. 
 You have access to the user's profile and learning recommendations. 
 Be supportive, encouraging, and provide specific guidance based on the user's context.
 If the user asks about their learning path, refer to their recommendations.
 Keep responses concise and focused on learning and skill development."""
 
-@router.post("/chat", response_model=schemas.ChatResponse)
-async def chat_with_llm(
-    chat: schemas.ChatMessage,
-    db: Session = Depends(get_db)
-) -> Dict[str, Any]:
-    """
-    Chat with the learning assistant.
-    
-    This endpoint accepts a message and an optional profile_id for context,
-    and returns a response from the learning assistant.
-    """
+# Messages that are only a greeting get a canned reply without an LLM call
+GREETING_RESPONSE = "Hello! I'm your learning assistant. How can I help you with your learning journey today?"
+
+_GREETING_ONLY = re.compile(
+    r"^(hi|hello|hey|hiya|greetings|good (morning|afternoon|evening))( there)?[\s!.,]*$",
+    re.IGNORECASE
+)
+
+# An AsyncSession must not be shared between concurrent tasks, so each loader
+# opens its own short-lived session from the pool.
+async def _load_profile(profile_id: int) -> Optional[models.Profile]:
+    async with AsyncSessionLocal() as db:
+        return await crud.get_profile(db, profile_id=profile_id)
+
+async def _load_recs(profile_id: int) -> List[models.Recommendation]:
+    async with AsyncSessionLocal() as db:
+        return await crud.get_recommendations_by_profile(
+            db,
+            profile_id=profile_id,
+            limit=1
+        )
+
+async def _build_context(profile_id: Optional[int]) -> Tuple[Dict[str, Any], Optional[tuple]]:
+    """Build the profile/recommendation context and its version key."""
     context = {}
+    context_key = None
     
     # Add profile and recommendation context if profile_id is provided
-    if chat.profile_id:
-        # Get the latest recommendations for this profile
-        recommendations = crud.get_recommendations_by_profile(
-            db, 
-            profile_id=chat.profile_id,
-            limit=1
+    if profile_id:
+        # Fetch the profile and its latest recommendations concurrently
+        profile, recommendations = await asyncio.gather(
+            _load_profile(profile_id),
+            _load_recs(profile_id)
         )
         
         if recommendations:
@@ -48,8 +66,10 @@ async def chat_with_llm(
                 for rec in recommendations
             ]
         
-        # Get profile details
-        profile = crud.get_profile(db, profile_id=chat.profile_id)
+        # Profile and recommendation blocks only change when a new
+        # recommendation is stored, so key their serialised form on that
+        context_key = (profile_id, recommendations[0].id if recommendations else None)
+        
         if profile:
             context["profile"] = {
                 "education_level": profile.education_level,
@@ -58,12 +78,84 @@ async def chat_with_llm(
                 "learning_pace": profile.learning_pace
             }
     
-    # Generate response using the AI agent
-    response = await ai_agent.call_llm(
-        message=chat.message,
-        system_prompt=SYSTEM_PROMPT,
-        context=context
-    )
+    return context, context_key
+
+def _sse_event(data: str, event: Optional[str] = None) -> str:
+    """Format a single Server-Sent Event."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {data}\n\n"
+
+async def _stream_chat(
+    chat: schemas.ChatMessage,
+    context: Dict[str, Any],
+    context_key: Optional[tuple],
+    timestamp: str
+) -> AsyncIterator[str]:
+    """
+    Stream the assistant's response as SSE ``data`` events (JSON-encoded text
+    chunks), followed by a final ``done`` event carrying the full ChatResponse.
+    """
+    if _GREETING_ONLY.match(chat.message):
+        response = GREETING_RESPONSE
+        yield _sse_event(json.dumps(response))
+    else:
+        chunks = []
+        async for chunk in ai_agent.call_llm_stream(
+            message=chat.message,
+            system_prompt=SYSTEM_PROMPT,
+            context=context,
+            context_key=context_key
+        ):
+            chunks.append(chunk)
+            yield _sse_event(json.dumps(chunk))
+        response = "".join(chunks)
+    
+    done = {
+        "message": chat.message,
+        "response": response,
+        "suggested_responses": generate_suggested_responses(chat.message, context),
+        "timestamp": timestamp,
+        "context_used": bool(context)
+    }
+    yield _sse_event(json.dumps(done), event="done")
+
+@router.post("/chat", response_model=schemas.ChatResponse)
+async def chat_with_llm(
+    chat: schemas.ChatMessage,
+    stream: bool = False
+) -> Dict[str, Any]:
+    """
+    Chat with the learning assistant.
+    
+    This endpoint accepts a message and an optional profile_id for context,
+    and returns a response from the learning assistant.
+    
+    With ``?stream=true`` the response is sent as Server-Sent Events while it
+    is generated: one ``data`` event per text chunk, then a ``done`` event
+    whose data is the full ChatResponse JSON.
+    """
+    # Single clock read per request, shared by both response paths
+    now_iso = datetime.utcnow().isoformat()
+    context, context_key = await _build_context(chat.profile_id)
+    
+    if stream:
+        return StreamingResponse(
+            _stream_chat(chat, context, context_key, now_iso),
+            media_type="text/event-stream"
+        )
+    
+    # Answer bare greetings directly; repeated questions are served from the
+    # AI agent's response caches
+    if _GREETING_ONLY.match(chat.message):
+        response = GREETING_RESPONSE
+    else:
+        # Generate response using the AI agent
+        response = await ai_agent.call_llm(
+            message=chat.message,
+            system_prompt=SYSTEM_PROMPT,
+            context=context,
+            context_key=context_key
+        )
     
     # Generate some suggested follow-up questions
     suggested_responses = generate_suggested_responses(chat.message, context)
@@ -72,22 +164,42 @@ async def chat_with_llm(
         "message": chat.message,
         "response": response,
         "suggested_responses": suggested_responses,
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": now_iso,
         "context_used": bool(context)  # Indicate if profile context was used
     }
 
+# Follow-up suggestions triggered by keywords in the user's message. The matcher
+# is compiled once so each request scans the message a single time.
+_TRIGGERED_SUGGESTIONS = {
+    "learning": (
+        "What are the prerequisites for this topic?",
+        "How long will it take to learn this?",
+        "Can you recommend learning resources?"
+    ),
+}
+
+_SUGGESTION_MATCHER = KeywordMatcher({
+    "learning": ("learn", "study", "skill"),
+})
+
+# Fallback suggestions used to top the list up to three
+_GENERAL_SUGGESTIONS = (
+    "What's the best way to track my progress?",
+    "How can I stay motivated while learning?",
+    "Can you explain this in simpler terms?",
+    "What are some practical projects I can work on?"
+)
+
 def generate_suggested_responses(message: str, context: Dict) -> List[str]:
     """Generate suggested follow-up questions based on the message and context."""
     message_lower = message.lower()
     suggestions = []
     
-    # General suggestions
-    if any(word in message_lower for word in ["learn", "study", "skill"]):
-        suggestions.extend([
-            "What are the prerequisites for this topic?",
-            "How long will it take to learn this?",
-            "Can you recommend learning resources?"
-        ])
+    # Keyword-triggered suggestions, in declaration order
+    triggered = _SUGGESTION_MATCHER.categories(message_lower)
+    for category, category_suggestions in _TRIGGERED_SUGGESTIONS.items():
+        if category in triggered:
+            suggestions.extend(category_suggestions)
     
     # If we have recommendations in context
     if context.get("recommendations"):
@@ -101,16 +213,10 @@ def generate_suggested_responses(message: str, context: Dict) -> List[str]:
             next_step = recs["pathway"][0].get("title", "next step")
             suggestions.append(f"Tell me more about {next_step}")
     
-    # Add some general suggestions if we don't have enough
-    while len(suggestions) < 3:
-        general = [
-            "What's the best way to track my progress?",
-            "How can I stay motivated while learning?",
-            "Can you explain this in simpler terms?",
-            "What are some practical projects I can work on?"
-        ]
-        for s in general:
-            if s not in suggestions and len(suggestions) < 3:
-                suggestions.append(s)
+    # Top up with general suggestions if we don't have enough
+    needed = 3 - len(suggestions)
+    if needed > 0:
+        seen = set(suggestions)
+        suggestions.extend([s for s in _GENERAL_SUGGESTIONS if s not in seen][:needed])
             
     return suggestions[:3]  # Return max 3 suggestions
@@ -1,19 +1,42 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+import time
+import orjson
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app import crud, models
 from app.schemas import NSQFCourse as NSQFCourseSchema
-from typing import List
+from typing import List, Optional, Tuple
 
 router = APIRouter()
 
+# NSQF courses are reference data that rarely change, so the serialised JSON
+# body is cached in-process for COURSES_CACHE_TTL seconds. The table is only
+# written by scripts/init_db.py, in a separate process, so the TTL is what
+# bounds staleness
+COURSES_CACHE_TTL = 300
+
+_courses_blob: Optional[Tuple[float, bytes]] = None
+
+def _serialize_courses(courses: List[models.NSQFCourse]) -> bytes:
+    return orjson.dumps([
+        NSQFCourseSchema.model_validate(course).model_dump(mode="json")
+        for course in courses
+    ])
+
+async def _get_courses_blob(db: AsyncSession) -> bytes:
+    global _courses_blob
+    now = time.monotonic()
+    if _courses_blob is None or now - _courses_blob[0] > COURSES_CACHE_TTL:
+        _courses_blob = (now, _serialize_courses(await crud.get_nsqf_courses(db)))
+    return _courses_blob[1]
+
 @router.get("/courses", response_model=List[NSQFCourseSchema])
-def get_courses(db: Session = Depends(get_db)):
+async def get_courses(db: AsyncSession = Depends(get_db)):
     """
     Get all available NSQF courses.
     
     Returns a list of courses with their details including NSQF level, qualification,
     example courses, and description.
     """
-    return crud.get_nsqf_courses(db)
+    return Response(content=await _get_courses_blob(db), media_type="application/json")
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.database import get_db
@@ -8,7 +8,7 @@ from app import schemas, crud
 router = APIRouter()
 
 @router.post("/profile", response_model=schemas.Profile, status_code=status.HTTP_201_CREATED)
-def create_profile(profile: schemas.ProfileCreate, db: Session = Depends(get_db)):
+async def create_profile(profile: schemas.ProfileCreate, db: AsyncSession = Depends(get_db)):
     """
     Create a new learner profile.
     
@@ -17,4 +17,4 @@ def create_profile(profile: schemas.ProfileCreate, db: Session = Depends(get_db)
     - **aspirations**: Career aspirations or goals
     - **learning_pace**: Learning pace (slow/normal/fast)
     """
-    return crud.create_profile(db=db, profile=profile)
+    return await crud.create_profile(db=db, profile=profile)
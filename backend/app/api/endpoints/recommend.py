@@ -1,17 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any
 
 from app.database import get_db
-from app import schemas, crud
-from app.services.recommender import HybridRecommender
+from app import schemas, crud, models
+from app.services.batched_recommender import BatchedRecommender
+from app.services.recommender import get_recommender
 
 router = APIRouter()
 
+def profile_to_dict(profile: models.Profile) -> Dict[str, Any]:
+    """Recommender input built straight from the ORM row (no Pydantic round-trip)."""
+    return {
+        "education_level": profile.education_level,
+        "prior_skills": profile.prior_skills,
+        "aspirations": profile.aspirations,
+        "learning_pace": profile.learning_pace
+    }
+
+# Concurrent requests are grouped into one recommender call (see BatchedRecommender)
+_batched_recommender = BatchedRecommender(get_recommender)
+
 @router.post("/recommend", status_code=status.HTTP_200_OK)
 async def get_recommendations(
     request: schemas.RecommendationRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Dict[str, Any]:
     """
     Get personalized learning path recommendations.
@@ -19,29 +32,29 @@ async def get_recommendations(
     Either provide a profile_id or a complete profile in the request body.
     """
     if request.profile_id:
-        profile = crud.get_profile(db, profile_id=request.profile_id)
+        profile = await crud.get_profile(db, profile_id=request.profile_id)
         if not profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Profile not found"
             )
-        profile_data = schemas.Profile.from_orm(profile).dict()
+        profile_data = profile_to_dict(profile)
     elif request.profile:
-        profile_data = request.profile.dict()
+        profile_data = request.profile.model_dump()
     else:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Either profile_id or profile must be provided"
         )
     
-    # Initialize and use the recommender
-    recommender = HybridRecommender()
-    recommendations = recommender.compute_recommendations(profile_data)
+    # The recommender is CPU-bound; batches run in the worker threadpool so
+    # they don't block the event loop for other requests
+    recommendations = await _batched_recommender.compute(profile_data)
     
     # Store the recommendation if we have a profile_id
     recommendation_id = None
     if request.profile_id:
-        recommendation_id = crud.create_recommendation(
+        recommendation_id = await crud.create_recommendation(
             db=db,
             profile_id=request.profile_id,
             recommendations=recommendations
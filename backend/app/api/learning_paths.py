@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, selectinload
 from typing import List
 
 from ..db.database import get_db
@@ -19,7 +20,7 @@ from ..services.learning_path_service import (
     update_learning_path as service_update_learning_path,
     delete_learning_path as service_delete_learning_path,
     create_learning_path_item as service_create_learning_path_item,
-    generate_learning_path_recommendations as service_generate_learning_path_recommendations
+    generate_learning_path as service_generate_learning_path
 )
 from ..services.user_service import get_current_active_user
 
@@ -36,7 +37,10 @@ def read_learning_paths(
     """
     Retrieve learning paths for the current user, optionally filtered by status.
     """
-    query = db.query(LearningPath).filter(LearningPath.user_id == current_user.id)
+    # Load every path's items in one extra query instead of one per path
+    query = db.query(LearningPath).options(
+        selectinload(LearningPath.items)
+    ).filter(LearningPath.user_id == current_user.id)
     
     if status:
         query = query.filter(LearningPath.status == status)
@@ -114,8 +118,14 @@ def add_learning_path_item(
     
     return service_create_learning_path_item(db=db, item=item, path_id=path_id)
 
+def _save_generated_path(db: Session, path: LearningPathCreate, user_id: int) -> LearningPathSchema:
+    """Save a generated path and serialise it, loading its items, in one blocking call."""
+    return LearningPathSchema.model_validate(
+        service_create_learning_path(db=db, path=path, user_id=user_id)
+    )
+
 @router.post("/generate", response_model=LearningPathSchema)
-def generate_learning_path(
+async def generate_learning_path(
     topic: str,
     current_level: str = "beginner",
     time_commitment: str = "medium",
@@ -127,16 +137,17 @@ def generate_learning_path(
     """
     try:
         # Generate the learning path recommendations
-        learning_path = service_generate_learning_path_recommendations(
-            db=db,
+        learning_path = await service_generate_learning_path(
             user_id=current_user.id,
             topic=topic,
             current_level=current_level,
             time_commitment=time_commitment
         )
         
-        # Create the learning path in the database
-        return service_create_learning_path(
+        # Create the learning path in the database; the sync Session blocks,
+        # so it runs in the worker threadpool rather than on the event loop
+        return await run_in_threadpool(
+            _save_generated_path,
             db=db,
             path=learning_path,
             user_id=current_user.id
@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -9,6 +10,18 @@ load_dotenv()
 # Get database URL from environment or use SQLite as fallback
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./learning_path.db")
 
+def _async_database_url(url: str) -> str:
+    """Map a sync database URL onto its asyncio driver (aiosqlite / asyncpg)."""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgresql:"):
+        return url.replace("postgresql:", "postgresql+asyncpg:", 1)
+    return url
+
+ASYNC_DATABASE_URL = _async_database_url(DATABASE_URL)
+
 # Check if we're using SQLite (for development)
 if DATABASE_URL.startswith("sqlite"):
     engine = create_engine(
@@ -18,14 +31,18 @@ else:
     # For PostgreSQL and other databases
     engine = create_engine(DATABASE_URL)
 
+# Async engine used by the API request handlers; the sync engine above is kept
+# for table creation and the scripts in backend/scripts.
+async_engine = create_async_engine(ASYNC_DATABASE_URL)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
 Base = declarative_base()
 
-def get_db():
-    """Dependency for getting database session"""
-    db = SessionLocal()
-    try:
+async def get_db():
+    """Dependency for getting an async database session"""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
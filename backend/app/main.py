@@ -1,6 +1,9 @@
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
+import anyio
+import logging
 import uvicorn
 import os
 from dotenv import load_dotenv
@@ -11,6 +14,9 @@ from .models import *
 
 # Import API routers
 from .api.endpoints import profile, recommend, courses, chat
+from .services.recommender import get_recommender
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -21,7 +27,8 @@ Base.metadata.create_all(bind=engine)
 app = FastAPI(
     title="Personalized Learning Path API",
     description="API for generating and managing personalized learning paths based on skills and aspirations",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware configuration
@@ -33,6 +40,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Cap the threadpool used for sync work (anyio.to_thread / sync endpoints) so
+# bursts queue instead of thrashing hundreds of threads
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", 64))
+
+@app.on_event("startup")
+async def configure_threadpool():
+    """Size the anyio worker threadpool."""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+@app.on_event("startup")
+def preload_recommender():
+    """Load the fitted recommender before the first /recommend request."""
+    try:
+        get_recommender()
+    except Exception as e:
+        # The database may not be seeded yet; the recommender loads on first use
+        logger.warning(f"Error preloading recommender: {e}")
+
 # Include API routers
 app.include_router(profile.router, prefix="/api", tags=["profiles"])
 app.include_router(recommend.router, prefix="/api", tags=["recommendations"])
@@ -49,6 +74,20 @@ async def health_check():
 async def root():
     return {"message": "Welcome to the Personalized Learning Path API"}
 
-# For development
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # reload is dev-only and forces a single worker; otherwise run
+    # WEB_CONCURRENCY workers (default 2 * CPUs + 1) to use every core
+    reload = os.getenv("ENV") == "development"
+    workers = 1 if reload else int(
+        os.getenv("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1)
+    )
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=reload,
+        workers=workers,
+        # Reject with 503 beyond this many in-flight connections per worker
+        limit_concurrency=int(os.getenv("LIMIT_CONCURRENCY", 200)),
+        backlog=2048
+    )
@@ -1,3 +1,5 @@
 from .profile import Profile
 from .recommendation import Recommendation
 from .nsqf_course import NSQFCourse
+from .user import User
+from .learning_path import LearningPath, LearningPathItem
@@ -1,3 +1,2 @@
-from sqlalchemy.ext.declarative import declarative_base
-
-Base = declarative_base()
+# All models share the app's declarative base, so one create_all covers them
+from ..database import Base
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Enum, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Enum, DateTime, Boolean
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .base import Base
@@ -10,6 +10,10 @@ class LearningPathStatus(str, enum.Enum):
     COMPLETED = "completed"
     ARCHIVED = "archived"
 
+class LearningPathGenerationMode(str, enum.Enum):
+    SYNC = "sync"
+    BATCH = "batch"
+
 class LearningPath(Base):
     __tablename__ = "learning_paths"
 
@@ -18,6 +22,10 @@ class LearningPath(Base):
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     status = Column(Enum(LearningPathStatus), default=LearningPathStatus.DRAFT)
+    generation_mode = Column(Enum(LearningPathGenerationMode), default=LearningPathGenerationMode.SYNC)
+    # Set while a batch generation is pending; results are matched on the custom ID
+    batch_id = Column(String, nullable=True, index=True)
+    batch_custom_id = Column(String, nullable=True, unique=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
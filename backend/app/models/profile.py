@@ -1,4 +1,5 @@
 from sqlalchemy import Column, Integer, String, JSON, DateTime
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
 
@@ -11,3 +12,8 @@ class Profile(Base):
     aspirations = Column(String)
     learning_pace = Column(String)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships (lazy="raise": load explicitly with selectinload/joinedload)
+    recommendations = relationship(
+        "Recommendation", back_populates="profile", lazy="raise"
+    )
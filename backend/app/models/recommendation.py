@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, JSON, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, JSON, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
 
@@ -9,3 +10,11 @@ class Recommendation(Base):
     profile_id = Column(Integer, ForeignKey("profiles.id"))
     recommendations = Column(JSON)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Serves "latest recommendations for a profile" as an index range scan
+    __table_args__ = (
+        Index("ix_rec_profile_created", profile_id, created_at.desc()),
+    )
+
+    # Relationships (lazy="raise": load explicitly with selectinload/joinedload)
+    profile = relationship("Profile", back_populates="recommendations", lazy="raise")
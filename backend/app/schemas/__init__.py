@@ -7,6 +7,7 @@ from .profile import ProfileBase, ProfileCreate, Profile, RecommendationRequest
 from .chat import ChatMessage, ChatResponse
 from .learning_path import (
     LearningPathStatus,
+    LearningPathGenerationMode,
     LearningPathItemType,
     LearningPathItemBase,
     LearningPathItemCreate,
@@ -45,6 +46,7 @@ __all__ = [
     'ChatResponse',
     'NSQFCourse',
     'LearningPathStatus',
+    'LearningPathGenerationMode',
     'LearningPathItemType',
     'LearningPathItemBase',
     'LearningPathItemCreate',
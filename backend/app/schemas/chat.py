@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
+MAX_MESSAGE_LENGTH = 4000
+
 class ChatMessage(BaseModel):
     """Request model for chat messages."""
     message: str = Field(..., description="The message content")
@@ -10,6 +12,15 @@ class ChatMessage(BaseModel):
         description="Optional profile ID for personalized context"
     )
 
+    @validator('message')
+    def validate_message(cls, v):
+        v = v.strip()
+        if not v:
+            raise ValueError("Message must not be empty")
+        if len(v) > MAX_MESSAGE_LENGTH:
+            raise ValueError(f"Message must be at most {MAX_MESSAGE_LENGTH} characters")
+        return v
+
 class ChatResponse(BaseModel):
     """Response model for chat interactions."""
     message: str = Field(..., description="The user's original message")
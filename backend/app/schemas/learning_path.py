@@ -9,6 +9,10 @@ class LearningPathStatus(str, Enum):
     COMPLETED = "completed"
     ARCHIVED = "archived"
 
+class LearningPathGenerationMode(str, Enum):
+    SYNC = "sync"
+    BATCH = "batch"
+
 class LearningPathItemType(str, Enum):
     COURSE = "course"
     ARTICLE = "article"
@@ -67,6 +71,7 @@ class LearningPathUpdate(LearningPathBase):
 class LearningPathInDBBase(LearningPathBase):
     id: int
     user_id: int
+    generation_mode: LearningPathGenerationMode = LearningPathGenerationMode.SYNC
     created_at: datetime
     updated_at: Optional[datetime] = None
     items: List[LearningPathItem] = []
@@ -1,11 +1,45 @@
 import os
-from typing import Dict, Optional, List
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, Optional, List, Hashable, Tuple
 import json
-import random
+import zlib
+
+import numpy as np
+
+from .keyword_matcher import KeywordMatcher
+from .llm_cache import llm_cache
+from .rate_limiter import openai_rate_limiter
+from .semantic_cache import semantic_cache
+
+# Maximum number of serialised context blocks kept by AIAgent
+CONTEXT_BLOCK_CACHE_SIZE = 1024
+
+# Completions are only cached (exactly or semantically) at or below this
+# temperature; above it the output is meant to vary between calls
+CACHEABLE_TEMPERATURE = 0.1
+
+# Embedding model used to match near-duplicate messages in the semantic cache
+EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+
+# Keyword-triggered fragments for the fallback response, in output order
+LEARNING_RESPONSES = {
+    "learn": "Learning new skills takes time and practice. ",
+    "difficult": "Challenging topics can be tough, but don't give up! ",
+    "help": "I'm here to help you with your learning journey. ",
+    "recommend": "Based on your profile, I'd recommend focusing on ",
+    "what": "That's a great question! "
+}
+
+# Compiled once so each fallback response scans the message a single time
+_RESPONSE_MATCHER = KeywordMatcher({
+    "greeting": ("hello", "hi", "hey", "greetings"),
+    "thanks": ("thank", "thanks", "appreciate"),
+    "learning": tuple(LEARNING_RESPONSES),
+})
 
 # Try to import OpenAI, but make it optional
 try:
-    from openai import OpenAI
+    from openai import AsyncOpenAI
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
@@ -18,27 +52,23 @@ class AIAgent:
     
     def __init__(self):
         self.client = None
-        self.model = "gpt-4"  # Default model
+        # Configured rather than discovered, so startup makes no API calls
+        self.model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        self.temperature = float(os.getenv("OPENAI_TEMPERATURE", 0.7))
         self.api_key = os.getenv("OPENAI_API_KEY")
+        # Serialised profile/recommendation blocks keyed by (context_key, block)
+        self._context_blocks: "OrderedDict[tuple, str]" = OrderedDict()
         
         if self.api_key and OPENAI_AVAILABLE:
-            self.client = OpenAI(api_key=self.api_key)
-            # Try to use a smaller model if available
-            try:
-                models = self.client.models.list()
-                if any(m.id == "gpt-4-turbo" for m in models.data):
-                    self.model = "gpt-4-turbo"
-                elif any(m.id == "gpt-3.5-turbo" for m in models.data):
-                    self.model = "gpt-3.5-turbo"
-            except Exception:
-                # If we can't list models, use the default
-                pass
+            # openai_rate_limiter retries 429s and 5xx; SDK retries would repeat each of those
+            self.client = AsyncOpenAI(api_key=self.api_key, max_retries=0)
     
     async def call_llm(
         self, 
         message: str, 
         system_prompt: Optional[str] = None,
-        context: Optional[Dict] = None
+        context: Optional[Dict] = None,
+        context_key: Optional[Hashable] = None
     ) -> str:
         """
         Call the LLM with the given message and optional system prompt.
@@ -48,82 +78,257 @@ class AIAgent:
             message: The user's message
             system_prompt: Optional system prompt to guide the LLM
             context: Optional additional context (e.g., user profile, recommendations)
+            context_key: Optional version key for ``context`` (e.g. profile and
+                recommendation IDs); when given, the serialised context blocks
+                are reused across calls instead of being rebuilt
             
         Returns:
             The assistant's response
         """
         if self.client and self.api_key:
-            return await self._call_openai(message, system_prompt, context)
+            return await self._call_openai(message, system_prompt, context, context_key)
         else:
             return self._simple_response(message, context)
     
-    async def _call_openai(
-        self, 
-        message: str, 
+    async def call_llm_stream(
+        self,
+        message: str,
         system_prompt: Optional[str] = None,
-        context: Optional[Dict] = None
-    ) -> str:
-        """Call the OpenAI API with the given message and context."""
-        try:
-            messages = []
-            
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
+        context: Optional[Dict] = None,
+        context_key: Optional[Hashable] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream the LLM response as text chunks as they are generated.
+        Falls back to a single chunk with the simple response if the LLM is
+        not available. Arguments are the same as for ``call_llm``; use
+        ``call_llm`` when the full text is needed at once.
+        """
+        if self.client and self.api_key:
+            async for chunk in self._stream_openai(message, system_prompt, context, context_key):
+                yield chunk
+        else:
+            yield self._simple_response(message, context)
+    
+    def _context_block(self, context_key: Optional[Hashable], block: str, payload: Dict) -> str:
+        """Serialise a context block, reusing the cached bytes for a known key."""
+        if context_key is None:
+            return json.dumps(payload, indent=2, sort_keys=True)
+        
+        cache_key = (context_key, block)
+        cached = self._context_blocks.get(cache_key)
+        if cached is not None:
+            self._context_blocks.move_to_end(cache_key)
+            return cached
+        
+        serialised = json.dumps(payload, indent=2, sort_keys=True)
+        self._context_blocks[cache_key] = serialised
+        if len(self._context_blocks) > CONTEXT_BLOCK_CACHE_SIZE:
+            self._context_blocks.popitem(last=False)
+        return serialised
+    
+    def _build_messages(
+        self,
+        message: str,
+        system_prompt: Optional[str] = None,
+        context: Optional[Dict] = None,
+        context_key: Optional[Hashable] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Build the chat messages with the most stable content first.
+        
+        Order is system prompt, learner profile, remaining context, user message.
+        Context is serialised with sorted keys so the leading messages stay
+        byte-identical across a user's turns and can be served from the
+        provider's automatic prompt prefix cache.
+        """
+        messages = []
+        
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        
+        if context:
+            profile = context.get("profile")
+            if profile:
+                profile_str = self._context_block(context_key, "profile", profile)
+                messages.append({
+                    "role": "system",
+                    "content": f"Here is the user's learner profile:\n{profile_str}"
+                })
             
-            if context:
+            remaining = {k: v for k, v in context.items() if k != "profile"}
+            if remaining:
                 # Add context as a system message
-                context_str = json.dumps(context, indent=2)
+                context_str = self._context_block(context_key, "context", remaining)
                 messages.append({
                     "role": "system",
                     "content": f"Here is some context about the user and their learning path:\n{context_str}"
                 })
+        
+        messages.append({"role": "user", "content": message})
+        return messages
+    
+    async def _embed(self, message: str) -> Tuple[str, np.ndarray]:
+        """
+        Embed ``message`` for the semantic cache.
+        
+        Returns the embedder name with the L2-normalised vector. Falls back to
+        the cache's local embedding if the OpenAI request fails; the name keeps
+        the two kinds of vector in separate cache partitions.
+        """
+        try:
+            response = await openai_rate_limiter.create_embedding(
+                self.client, model=EMBEDDING_MODEL, input=message
+            )
+            embedding = np.asarray(response.data[0].embedding, dtype=np.float32)
+            return EMBEDDING_MODEL, embedding / np.linalg.norm(embedding)
+        except Exception as e:
+            print(f"Error creating OpenAI embedding: {e}")
+            return "local", semantic_cache.embed(message)
+    
+    def _exact_cache_key(self, messages: List[Dict[str, str]]) -> Optional[str]:
+        """Exact-match cache key for a completion, or None if it isn't cacheable."""
+        # Only near-deterministic completions are safe to replay from cache
+        if self.temperature > CACHEABLE_TEMPERATURE:
+            return None
+        return llm_cache.make_key({
+            "model": self.model,
+            "messages": messages,
+            "temperature": self.temperature
+        })
+    
+    async def _call_openai(
+        self, 
+        message: str, 
+        system_prompt: Optional[str] = None,
+        context: Optional[Dict] = None,
+        context_key: Optional[Hashable] = None
+    ) -> str:
+        """Call the OpenAI API with the given message and context."""
+        try:
+            messages = self._build_messages(message, system_prompt, context, context_key)
             
-            messages.append({"role": "user", "content": message})
+            # Both caches share the exact cache's temperature gate
+            cache_key = self._exact_cache_key(messages)
+            if cache_key is not None:
+                cached = await llm_cache.get(cache_key)
+                if cached is not None:
+                    return cached
+                
+                # Rephrasings of an earlier question in the same context are
+                # served from the semantic cache for one embedding call
+                embedder, embedding = await self._embed(message)
+                partition = (embedder, context_key)
+                context_hash = semantic_cache.context_hash({"system": system_prompt, "context": context})
+                cached = semantic_cache.get(partition, embedding, context_hash)
+                if cached is not None:
+                    return cached
             
-            response = await self.client.chat.completions.create(
+            response = await openai_rate_limiter.create_chat_completion(
+                self.client,
                 model=self.model,
                 messages=messages,
-                temperature=0.7,
+                temperature=self.temperature,
                 max_tokens=500
             )
             
-            return response.choices[0].message.content.strip()
+            content = response.choices[0].message.content.strip()
+            if cache_key is not None:
+                await llm_cache.set(cache_key, content)
+                semantic_cache.set(partition, embedding, context_hash, content)
+            return content
             
         except Exception as e:
             # Fall back to simple response if API call fails
             print(f"Error calling OpenAI API: {e}")
             return self._simple_response(message, context)
     
+    async def _stream_openai(
+        self,
+        message: str,
+        system_prompt: Optional[str] = None,
+        context: Optional[Dict] = None,
+        context_key: Optional[Hashable] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream completion deltas from the OpenAI API.
+        
+        Uses the same response caches as ``_call_openai``: a hit is sent as a
+        single chunk, and a completed stream is buffered and stored.
+        """
+        messages = self._build_messages(message, system_prompt, context, context_key)
+        cached = cache_key = partition = None
+        try:
+            cache_key = self._exact_cache_key(messages)
+            if cache_key is not None:
+                cached = await llm_cache.get(cache_key)
+            
+            # Both caches share the exact cache's temperature gate
+            if cache_key is not None and cached is None:
+                embedder, embedding = await self._embed(message)
+                partition = (embedder, context_key)
+                context_hash = semantic_cache.context_hash({"system": system_prompt, "context": context})
+                cached = semantic_cache.get(partition, embedding, context_hash)
+        except Exception as e:
+            print(f"Error reading response cache: {e}")
+        
+        if cached is not None:
+            yield cached
+            return
+        
+        try:
+            stream = await openai_rate_limiter.create_chat_completion(
+                self.client,
+                model=self.model,
+                messages=messages,
+                temperature=self.temperature,
+                max_tokens=500,
+                stream=True
+            )
+        except Exception as e:
+            # Fall back to simple response if the request can't be started
+            print(f"Error calling OpenAI API: {e}")
+            yield self._simple_response(message, context)
+            return
+        
+        chunks = []
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    chunks.append(chunk.choices[0].delta.content)
+                    yield chunks[-1]
+        except Exception as e:
+            # Tokens already sent can't be retracted; end the stream here
+            print(f"Error streaming from OpenAI API: {e}")
+            return
+        
+        # Only complete responses are cached
+        content = "".join(chunks).strip()
+        if cache_key is not None:
+            await llm_cache.set(cache_key, content)
+        if partition is not None:
+            semantic_cache.set(partition, embedding, context_hash, content)
+    
     def _simple_response(self, message: str, context: Optional[Dict] = None) -> str:
         """Generate a simple deterministic response when LLM is not available."""
-        # Simple keyword-based responses
-        greetings = ["hello", "hi", "hey", "greetings"]
-        thanks = ["thank", "thanks", "appreciate"]
-        
+        # Simple keyword-based responses, all found in one pass over the message
         message_lower = message.lower()
+        hits = _RESPONSE_MATCHER.matches(message_lower)
+        categories = {category for category, _ in hits}
         
         # Check for greetings
-        if any(word in message_lower for word in greetings):
+        if "greeting" in categories:
             return "Hello! I'm your learning assistant. How can I help you with your learning journey today?"
         
         # Check for thanks
-        if any(word in message_lower for word in thanks):
+        if "thanks" in categories:
             return "You're welcome! Is there anything else I can help you with?"
         
-        # Check for learning-related keywords
-        learning_keywords = {
-            "learn": "Learning new skills takes time and practice. ",
-            "difficult": "Challenging topics can be tough, but don't give up! ",
-            "help": "I'm here to help you with your learning journey. ",
-            "recommend": "Based on your profile, I'd recommend focusing on ",
-            "what": "That's a great question! "
-        }
-        
-        # Build a response based on keywords
-        response_parts = []
-        for keyword, text in learning_keywords.items():
-            if keyword in message_lower:
-                response_parts.append(text)
+        # Build a response based on learning-related keywords
+        matched = {keyword for category, keyword in hits if category == "learning"}
+        response_parts = [
+            text for keyword, text in LEARNING_RESPONSES.items()
+            if keyword in matched
+        ]
         
         # If we found matching keywords, use them
         if response_parts:
@@ -153,7 +358,9 @@ class AIAgent:
             "Would you like me to suggest some learning resources?"
         ]
         
-        response += random.choice(closings)
+        # Picked from the message rather than at random so identical inputs
+        # give identical (cacheable) responses
+        response += closings[zlib.crc32(message_lower.encode("utf-8")) % len(closings)]
         return response
 
 # Create a singleton instance
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import anyio
+
+from .recommender import HybridRecommender
+
+logger = logging.getLogger(__name__)
+
+
+class BatchedRecommender:
+    """
+    Micro-batching front end for ``HybridRecommender``.
+
+    Profiles submitted within ``max_wait`` seconds of each other (up to
+    ``max_batch_size``) are computed with a single ``compute_batch`` call in the
+    worker threadpool, so concurrent ``/recommend`` requests share one
+    vectorizer transform and one nearest-neighbour query.
+    """
+
+    def __init__(
+        self,
+        recommender_factory: Callable[[], HybridRecommender],
+        max_batch_size: int = 32,
+        max_wait: float = 0.01
+    ):
+        self.recommender_factory = recommender_factory
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def compute(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue ``profile`` for the next batch and wait for its recommendations."""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((profile, future))
+        return await future
+
+    def _ensure_worker(self) -> None:
+        # The queue and worker are bound to the loop they were created on
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._dispatch(batch)
+
+    async def _dispatch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        profiles = [profile for profile, _ in batch]
+        try:
+            results = await anyio.to_thread.run_sync(self._compute_batch, profiles)
+        except Exception as e:
+            logger.error(f"Batched recommendation failed: {str(e)}")
+            results = [e] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _compute_batch(self, profiles: List[Dict[str, Any]]) -> List[Any]:
+        recommender = self.recommender_factory()
+        try:
+            return recommender.compute_batch(profiles)
+        except ValueError:
+            # One invalid profile fails the whole batch; compute each on its
+            # own so only the offending request sees the error
+            results = []
+            for profile in profiles:
+                try:
+                    results.append(recommender.compute_recommendations(profile))
+                except ValueError as e:
+                    results.append(e)
+            return results
@@ -0,0 +1,53 @@
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Try to import pyahocorasick, but make it optional
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+class KeywordMatcher:
+    """
+    Multi-keyword substring matcher built once at import time.
+
+    Uses a pyahocorasick automaton when installed so every keyword is found in
+    a single pass over the text; otherwise falls back to one substring search
+    per keyword. Both paths have the same substring semantics as
+    ``keyword in text``.
+    """
+
+    def __init__(self, keywords: Dict[str, Iterable[str]]):
+        """
+        Args:
+            keywords: Mapping of category name to the keywords that trigger it
+        """
+        self._pairs: List[Tuple[str, str]] = [
+            (category, keyword)
+            for category, words in keywords.items()
+            for keyword in words
+        ]
+        self._automaton = None
+
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for category, keyword in self._pairs:
+                _, categories = self._automaton.get(keyword, (keyword, ()))
+                self._automaton.add_word(keyword, (keyword, categories + (category,)))
+            self._automaton.make_automaton()
+
+    def matches(self, text: str) -> Set[Tuple[str, str]]:
+        """Return the ``(category, keyword)`` pairs found in ``text``."""
+        if self._automaton is not None:
+            return {
+                (category, keyword)
+                for _, (keyword, categories) in self._automaton.iter(text)
+                for category in categories
+            }
+        return {(category, keyword) for category, keyword in self._pairs if keyword in text}
+
+    def categories(self, text: str) -> Set[str]:
+        """Return the categories triggered by ``text``."""
+        return {category for category, _ in self.matches(text)}
+
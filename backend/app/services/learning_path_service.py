@@ -1,14 +1,28 @@
+import asyncio
+import hashlib
 import json
 import logging
+from functools import lru_cache
 from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from fastapi import HTTPException, status
-import openai
+import httpx
+import numpy as np
+import orjson
 import os
 from dotenv import load_dotenv
 
+# Try to import OpenAI, but make it optional
+try:
+    from openai import AsyncOpenAI, OpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
 from ..models import LearningPath, LearningPathItem, User
+from ..models.learning_path import LearningPathGenerationMode
 from ..schemas.learning_path import LearningPathCreate, LearningPathUpdate, LearningPathItemCreate
+from .rate_limiter import openai_rate_limiter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,19 +31,50 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 # Initialize OpenAI
-openai.api_key = os.getenv("OPENAI_API_KEY")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 DEFAULT_OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
 
+# Upper bound on in-flight completion requests across all callers
+MAX_CONCURRENT_REQUESTS = int(os.getenv("OPENAI_MAX_CONCURRENT_REQUESTS", 50))
+
+# One client per process so requests reuse pooled keep-alive connections
+# instead of paying a TCP/TLS handshake each time. batch_client is used by
+# the (synchronous) Batch API jobs. SDK retries are off: openai_rate_limiter
+# retries completions, and stacking both multiplies the requests sent; a
+# failed batch call is retried by the next enqueue or poll.
+_client = None
+batch_client = None
+if OPENAI_API_KEY and OPENAI_AVAILABLE:
+    _client = AsyncOpenAI(
+        api_key=OPENAI_API_KEY,
+        max_retries=0,
+        http_client=httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=100, max_connections=200),
+            timeout=30
+        )
+    )
+    batch_client = OpenAI(api_key=OPENAI_API_KEY, max_retries=0)
+
+_request_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+# Batch jobs are billed at half price in exchange for completing within this window
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_PENDING_STATUSES = ("validating", "in_progress", "finalizing", "cancelling")
+
 # Constants
 VALID_SKILL_LEVELS = ["beginner", "intermediate", "advanced"]
 VALID_TIME_COMMITMENTS = ["low", "medium", "high"]
 VALID_ITEM_TYPES = ["course", "article", "video", "exercise", "project"]
 
 def get_learning_paths(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[LearningPath]:
-    return db.query(LearningPath).filter(LearningPath.user_id == user_id).offset(skip).limit(limit).all()
+    return db.query(LearningPath).options(
+        selectinload(LearningPath.items)
+    ).filter(LearningPath.user_id == user_id).offset(skip).limit(limit).all()
 
 def get_learning_path(db: Session, path_id: int, user_id: int) -> Optional[LearningPath]:
-    path = db.query(LearningPath).filter(
+    path = db.query(LearningPath).options(
+        selectinload(LearningPath.items)
+    ).filter(
         LearningPath.id == path_id,
         LearningPath.user_id == user_id
     ).first()
@@ -46,14 +91,18 @@ def create_learning_path(db: Session, path: LearningPathCreate, user_id: int) ->
         user_id=user_id
     )
     db.add(db_path)
-    db.commit()
-    db.refresh(db_path)
+    # Flush (not commit) to get the path ID for its items
+    db.flush()
     
-    # Add items if any
+    # Add items if any, in one executemany within the same transaction
     if path.items:
-        for item in path.items:
-            create_learning_path_item(db, item, db_path.id)
+        db.bulk_save_objects([
+            LearningPathItem(**item.dict(), learning_path_id=db_path.id)
+            for item in path.items
+        ])
     
+    db.commit()
+    db.refresh(db_path)
     return db_path
 
 def update_learning_path(
@@ -108,51 +157,53 @@ def _validate_and_format_input(topic: str, current_level: str, time_commitment:
     
     return topic.strip(), current_level, time_commitment
 
-def _generate_ai_prompt(topic: str, current_level: str, time_commitment: str) -> str:
-    """Generate the prompt for the AI."""
-    return f"""
-    Create a personalized learning path for someone who wants to learn "{topic}".
-    Current skill level: {current_level}
-    Time commitment: {time_commitment}
-    
-    Please provide a structured learning path with the following format:
-    - Each item should have a type (course, article, video, exercise, project)
-    - A title and description for each item
-    - Estimated time to complete each item (in minutes)
-    - A logical order for the items
-    
-    Format the response as a valid JSON array of objects with these required fields:
-    - item_type: one of {VALID_ITEM_TYPES}
-    - title: string
-    - description: string
-    - resource_url: string (can be empty)
-    - estimated_duration: number (in minutes, between 5 and 240)
-    - order: number (starting from 0)
-    
-    Example:
-    [
+# Static instructions sent as the system message. Keep this byte-identical
+# across calls (no per-request text) so the provider's automatic prompt prefix
+# cache can serve it; request parameters go in the short user message.
+SYSTEM_PROMPT = f"""You are a helpful learning assistant that creates personalized learning paths. Always respond with valid JSON.
+
+The user gives a topic, their current skill level and their time commitment.
+Create a structured learning path for them:
+- Each item should have a type (course, article, video, exercise, project)
+- A title and description for each item
+- Estimated time to complete each item (in minutes)
+- A logical order for the items
+
+Format the response as a JSON object with an "items" key holding an array of objects with these required fields:
+- item_type: one of {VALID_ITEM_TYPES}
+- title: string
+- description: string
+- resource_url: string (can be empty)
+- estimated_duration: number (in minutes, between 5 and 240)
+- order: number (starting from 0)
+
+Example for the topic "SQL":
+{{
+    "items": [
         {{
             "item_type": "course",
-            "title": "Introduction to {topic}",
-            "description": "Learn the basics of {topic}...",
+            "title": "Introduction to SQL",
+            "description": "Learn the basics of SQL...",
             "resource_url": "https://example.com/intro",
             "estimated_duration": 90,
             "order": 0
         }}
     ]
-    """
+}}"""
+
+def _generate_ai_prompt(topic: str, current_level: str, time_commitment: str) -> str:
+    """Generate the per-request user message for the AI."""
+    return f"Topic: {topic}\nCurrent skill level: {current_level}\nTime commitment: {time_commitment}"
 
 def _parse_ai_response(content: str) -> List[Dict[str, Any]]:
     """Parse the AI response into a list of learning path items."""
     try:
-        # Clean the response to extract just the JSON array
-        start = content.find('[')
-        end = content.rfind(']') + 1
-        json_str = content[start:end].strip()
-        items = json.loads(json_str)
+        # JSON mode guarantees a single JSON object, so no slicing is needed
+        data = orjson.loads(content)
+        items = data["items"]
         
-        # Validate each item
-        validated_items = []
+        # Structural validation of each item
+        valid_items = []
         for i, item in enumerate(items):
             if not all(k in item for k in ['item_type', 'title', 'description', 'estimated_duration', 'order']):
                 logger.warning(f"Skipping invalid item at index {i}: missing required fields")
@@ -161,24 +212,42 @@ def _parse_ai_response(content: str) -> List[Dict[str, Any]]:
             if item['item_type'] not in VALID_ITEM_TYPES:
                 logger.warning(f"Invalid item_type '{item['item_type']}' at index {i}")
                 continue
-                
-            validated_items.append({
+            
+            valid_items.append(item)
+        
+        # Numeric fields in one vectorized pass; durations are clamped to 5-240 minutes
+        # (as float64, so out-of-range values clamp instead of overflowing)
+        durations = np.clip(
+            np.array([int(item['estimated_duration']) for item in valid_items], dtype=np.float64),
+            5, 240
+        ).astype(np.int64).tolist()
+        orders = [int(item['order']) for item in valid_items]
+        
+        return [
+            {
                 'item_type': item['item_type'],
                 'title': str(item['title']).strip(),
                 'description': str(item['description']).strip(),
                 'resource_url': str(item.get('resource_url', '')).strip(),
-                'estimated_duration': max(5, min(240, int(item['estimated_duration']))),  # Clamp between 5-240 minutes
-                'order': int(item['order'])
-            })
-            
-        return validated_items
+                'estimated_duration': duration,
+                'order': order
+            }
+            for item, duration, order in zip(valid_items, durations, orders)
+        ]
         
-    except (json.JSONDecodeError, KeyError, ValueError) as e:
+    except (KeyError, TypeError, ValueError, OverflowError) as e:
+        # orjson.JSONDecodeError is a ValueError
         logger.error(f"Error parsing AI response: {str(e)}")
         raise ValueError("Failed to parse AI response")
 
+@lru_cache(maxsize=1024)
 def _create_default_path(topic: str, current_level: str) -> LearningPathCreate:
-    """Create a default learning path when AI generation fails."""
+    """
+    Create a default learning path when AI generation fails.
+    
+    Memoized per (topic, level), so the returned path is shared and must be
+    treated as read-only.
+    """
     return LearningPathCreate(
         title=f"{topic.title()} Learning Path",
         description=f"A personalized learning path for {topic} at {current_level} level.",
@@ -194,8 +263,35 @@ def _create_default_path(topic: str, current_level: str) -> LearningPathCreate:
         ]
     )
 
-def generate_learning_path_recommendations(
-    db: Session,
+def _build_chat_body(prompt: str) -> Dict[str, Any]:
+    """Build the chat completion request body for a learning path prompt."""
+    return {
+        "model": DEFAULT_OPENAI_MODEL,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.7,
+        "max_tokens": 1500,
+        # JSON mode: the reply is always one valid JSON object
+        "response_format": {"type": "json_object"}
+    }
+
+def _build_items(items_data: List[Dict[str, Any]]) -> List[LearningPathItemCreate]:
+    """Create learning path items from parsed AI items."""
+    return [
+        LearningPathItemCreate(
+            item_type=item["item_type"],
+            title=item["title"],
+            description=item["description"],
+            resource_url=item["resource_url"],
+            estimated_duration=item["estimated_duration"],
+            order=item["order"]
+        )
+        for item in items_data
+    ]
+
+async def generate_learning_path(
     user_id: int,
     topic: str,
     current_level: str = "beginner",
@@ -204,8 +300,12 @@ def generate_learning_path_recommendations(
     """
     Generate a personalized learning path using OpenAI's API.
     
+    This is the interactive path: the completion is requested immediately.
+    Use ``enqueue_learning_path_batch`` for bulk, non-interactive generation.
+    Nothing is read from or written to the database; save the result with
+    ``create_learning_path``.
+    
     Args:
-        db: Database session
         user_id: ID of the user requesting the learning path
         topic: The topic to learn about
         current_level: Skill level (beginner, intermediate, advanced)
@@ -228,17 +328,16 @@ def generate_learning_path_recommendations(
         # Generate the AI prompt
         prompt = _generate_ai_prompt(topic, current_level, time_commitment)
         
+        if _client is None:
+            logger.warning("OpenAI is not configured, using default path")
+            return _create_default_path(topic, current_level)
+        
         try:
             # Call OpenAI API
-            response = openai.ChatCompletion.create(
-                model=DEFAULT_OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are a helpful learning assistant that creates personalized learning paths. Always respond with valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1500
-            )
+            async with _request_semaphore:
+                response = await openai_rate_limiter.create_chat_completion(
+                    _client, **_build_chat_body(prompt)
+                )
             
             # Parse the AI response
             content = response.choices[0].message.content
@@ -251,24 +350,11 @@ def generate_learning_path_recommendations(
                 logger.warning("No valid items generated, using default path")
                 return _create_default_path(topic, current_level)
             
-            # Create LearningPathItem objects
-            items = [
-                LearningPathItemCreate(
-                    item_type=item["item_type"],
-                    title=item["title"],
-                    description=item["description"],
-                    resource_url=item["resource_url"],
-                    estimated_duration=item["estimated_duration"],
-                    order=item["order"]
-                )
-                for item in items_data
-            ]
-            
             # Create the learning path
             return LearningPathCreate(
                 title=f"{topic.title()} Learning Path",
                 description=f"A personalized learning path for {topic} at {current_level} level.",
-                items=items
+                items=_build_items(items_data)
             )
             
         except Exception as ai_error:
@@ -288,3 +374,190 @@ def generate_learning_path_recommendations(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error generating learning path: {str(e)}"
         )
+
+async def generate_learning_paths(requests: List[Dict[str, Any]]) -> List[LearningPathCreate]:
+    """
+    Generate learning paths for many users concurrently.
+    
+    In-flight OpenAI requests are capped at ``MAX_CONCURRENT_REQUESTS``.
+    No database session is taken: a sync Session can't be shared across the
+    concurrent generations, so callers save the results afterwards.
+    
+    Args:
+        requests: Dicts with ``user_id``, ``topic`` and optionally
+            ``current_level`` and ``time_commitment``
+        
+    Returns:
+        The generated learning paths, in request order
+    """
+    return await asyncio.gather(*[
+        generate_learning_path(
+            user_id=request["user_id"],
+            topic=request["topic"],
+            current_level=request.get("current_level", "beginner"),
+            time_commitment=request.get("time_commitment", "medium")
+        )
+        for request in requests
+    ])
+
+def _batch_custom_id(user_id: int, topic: str, current_level: str, time_commitment: str) -> str:
+    """Stable custom ID for a batched learning path request."""
+    topic_hash = hashlib.sha256(
+        f"{topic.lower()}|{current_level}|{time_commitment}".encode("utf-8")
+    ).hexdigest()[:16]
+    return f"lp-{user_id}-{topic_hash}"
+
+def _require_batch_client():
+    """Return the Batch API client, or raise 503 if OpenAI is not configured."""
+    if batch_client is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Batch generation requires OPENAI_API_KEY"
+        )
+    return batch_client
+
+def enqueue_learning_path_batch(db: Session, requests: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Submit learning path generation for many users as one OpenAI batch job.
+    
+    Each request gets a placeholder learning path (the default path, with
+    ``generation_mode`` set to batch) which is filled in by
+    ``process_learning_path_batch`` once the batch completes. Requests that
+    already have a pending batch path are skipped.
+    
+    Args:
+        db: Database session
+        requests: Dicts with ``user_id``, ``topic`` and optionally
+            ``current_level`` and ``time_commitment``
+        
+    Returns:
+        The batch ID, or None if there was nothing to submit
+        
+    Raises:
+        HTTPException: If the Batch API is not available or a request is invalid
+    """
+    client = _require_batch_client()
+    
+    lines = {}
+    paths = []
+    for request in requests:
+        try:
+            topic, current_level, time_commitment = _validate_and_format_input(
+                request["topic"],
+                request.get("current_level", "beginner"),
+                request.get("time_commitment", "medium")
+            )
+        except ValueError as ve:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(ve)
+            )
+        
+        custom_id = _batch_custom_id(request["user_id"], topic, current_level, time_commitment)
+        if custom_id in lines or db.query(LearningPath.id).filter(
+            LearningPath.batch_custom_id == custom_id
+        ).first():
+            continue
+        
+        lines[custom_id] = {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": _build_chat_body(_generate_ai_prompt(topic, current_level, time_commitment))
+        }
+        
+        default_path = _create_default_path(topic, current_level)
+        path = LearningPath(
+            **default_path.dict(exclude={"items"}),
+            user_id=request["user_id"],
+            generation_mode=LearningPathGenerationMode.BATCH,
+            batch_custom_id=custom_id
+        )
+        path.items = [LearningPathItem(**item.dict()) for item in default_path.items]
+        paths.append(path)
+    
+    if not lines:
+        return None
+    
+    payload = "\n".join(json.dumps(line) for line in lines.values()).encode("utf-8")
+    batch_file = client.files.create(file=("learning_paths.jsonl", payload), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window=BATCH_COMPLETION_WINDOW
+    )
+    logger.info(f"Submitted learning path batch {batch.id} with {len(lines)} requests")
+    
+    for path in paths:
+        path.batch_id = batch.id
+    db.add_all(paths)
+    db.commit()
+    return batch.id
+
+def process_learning_path_batch(db: Session, batch_id: str) -> bool:
+    """
+    Write the results of a finished batch job to its learning paths.
+    
+    Paths whose request failed or returned no valid items keep their default
+    items.
+    
+    Args:
+        db: Database session
+        batch_id: ID returned by ``enqueue_learning_path_batch``
+        
+    Returns:
+        True if the batch has finished and was processed, False if it is still running
+        
+    Raises:
+        HTTPException: If the Batch API is not available
+    """
+    client = _require_batch_client()
+    batch = client.batches.retrieve(batch_id)
+    if batch.status in BATCH_PENDING_STATUSES:
+        return False
+    
+    contents = {}
+    if batch.output_file_id:
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            result = json.loads(line)
+            response = result.get("response") or {}
+            if response.get("status_code") == 200:
+                contents[result["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+    else:
+        logger.error(f"Learning path batch {batch_id} ended with status {batch.status}")
+    
+    for path in db.query(LearningPath).filter(LearningPath.batch_id == batch_id).all():
+        try:
+            items_data = _parse_ai_response(contents[path.batch_custom_id])
+        except (KeyError, ValueError):
+            items_data = []
+        
+        if items_data:
+            path.items = [LearningPathItem(**item.dict()) for item in _build_items(items_data)]
+        else:
+            logger.warning(f"No valid items generated for {path.batch_custom_id}, keeping default path")
+        
+        path.batch_id = None
+        path.batch_custom_id = None
+    
+    db.commit()
+    return True
+
+def poll_learning_path_batches(db: Session) -> int:
+    """
+    Process every pending learning path batch that has finished.
+    
+    Meant to be run periodically by a scheduler (cron or a worker).
+    
+    Returns:
+        Number of batches processed
+        
+    Raises:
+        HTTPException: If the Batch API is not available
+    """
+    _require_batch_client()
+    batch_ids = [
+        batch_id for (batch_id,) in
+        db.query(LearningPath.batch_id).filter(LearningPath.batch_id.isnot(None)).distinct()
+    ]
+    return sum(process_learning_path_batch(db, batch_id) for batch_id in batch_ids)
@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Try to import redis, but make it optional
+try:
+    import redis.asyncio as redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+class LLMCache:
+    """
+    Exact-match cache for LLM completions.
+
+    Keys are the SHA-256 of the canonical JSON request payload (model, messages,
+    temperature). Entries live in an in-process LRU and, when ``redis_url`` is
+    set and redis is installed, are shared through Redis as well.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: int = 3600, redis_url: Optional[str] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._redis = None
+        if redis_url and REDIS_AVAILABLE:
+            self._redis = redis.from_url(redis_url, decode_responses=True)
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """Return the cache key for a request payload."""
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached completion for ``key``, if present and fresh."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return value
+            del self._entries[key]
+
+        if self._redis is not None:
+            try:
+                value = await self._redis.get(f"llm:{key}")
+            except Exception as e:
+                print(f"Error reading LLM cache from Redis: {e}")
+                value = None
+            if value is not None:
+                self._store_local(key, value, self.ttl)
+                self.stats["hits"] += 1
+                return value
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        """Store a completion under ``key`` for ``ttl`` seconds."""
+        ttl = ttl or self.ttl
+        self._store_local(key, value, ttl)
+        if self._redis is not None:
+            try:
+                await self._redis.set(f"llm:{key}", value, ex=ttl)
+            except Exception as e:
+                print(f"Error writing LLM cache to Redis: {e}")
+
+    def _store_local(self, key: str, value: str, ttl: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+# Create a singleton instance
+llm_cache = LLMCache(redis_url=os.getenv("REDIS_URL"))
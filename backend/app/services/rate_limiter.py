@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Mapping
+
+# Try to import tiktoken, but make it optional
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# Try to import OpenAI, but make it optional
+try:
+    from openai import InternalServerError, RateLimitError
+    RETRYABLE_ERRORS = (RateLimitError, InternalServerError)
+except ImportError:
+    RETRYABLE_ERRORS = ()
+
+logger = logging.getLogger(__name__)
+
+# Longest single backoff between retries, in seconds
+MAX_BACKOFF = 60
+
+
+@lru_cache(maxsize=16)
+def _encoding_for_model(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def num_tokens_from_text(text: str, model: str) -> int:
+    """
+    Estimate the tokens in ``text``.
+
+    Uses tiktoken when installed; otherwise assumes about four characters
+    per token, which is close enough for rate budgeting.
+    """
+    if TIKTOKEN_AVAILABLE:
+        return len(_encoding_for_model(model).encode(text))
+    return len(text) // 4 + 1
+
+
+def num_tokens_from_messages(messages: List[Dict[str, str]], model: str) -> int:
+    """Estimate the prompt tokens of chat ``messages``."""
+    # Every message carries a few tokens of framing, plus the reply primer
+    num_tokens = 3
+    for message in messages:
+        num_tokens += 3
+        for value in message.values():
+            num_tokens += num_tokens_from_text(value, model)
+    return num_tokens
+
+
+class RateLimiter:
+    """
+    Client-side requests-per-minute and tokens-per-minute budget.
+
+    Two token buckets refill continuously at ``rpm`` and ``tpm`` per minute.
+    A call waits until both have room, so bursts queue up locally instead of
+    being rejected with 429s. The buckets are corrected from the
+    ``x-ratelimit-remaining-*`` response headers, which also account for
+    other processes sharing the same API key.
+    """
+
+    def __init__(self, rpm: int, tpm: int, max_retries: int = 5):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_retries = max_retries
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    @asynccontextmanager
+    async def reserve(self, est_tokens: int = 0) -> AsyncIterator[None]:
+        """Wait until one request and ``est_tokens`` tokens are available, then take them."""
+        # A request larger than the whole budget can only wait for a full bucket
+        est_tokens = min(est_tokens, self.tpm)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._requests >= 1 and self._tokens >= est_tokens:
+                    self._requests -= 1
+                    self._tokens -= est_tokens
+                    break
+                await asyncio.sleep(max(
+                    (1 - self._requests) * 60 / self.rpm,
+                    (est_tokens - self._tokens) * 60 / self.tpm
+                ))
+        yield
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Lower the local budget to what the API reports as remaining."""
+        remaining_requests = headers.get("x-ratelimit-remaining-requests")
+        remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+        try:
+            if remaining_requests is not None:
+                self._requests = min(self._requests, float(remaining_requests))
+            if remaining_tokens is not None:
+                self._tokens = min(self._tokens, float(remaining_tokens))
+        except ValueError:
+            pass
+
+    async def create_chat_completion(self, client, **request: Any) -> Any:
+        """
+        Create a chat completion within the rate budget.
+
+        Retries with exponential backoff and jitter on 429 and 5xx errors.
+
+        Args:
+            client: An ``AsyncOpenAI`` client
+            **request: Arguments for ``client.chat.completions.create``
+
+        Returns:
+            The parsed response (an async stream when ``stream=True``)
+        """
+        est_tokens = num_tokens_from_messages(request["messages"], request["model"])
+        est_tokens += request.get("max_tokens") or 0
+        return await self._create(client.chat.completions.with_raw_response.create, est_tokens, request)
+
+    async def create_embedding(self, client, **request: Any) -> Any:
+        """
+        Create embeddings within the rate budget, retrying like ``create_chat_completion``.
+
+        Args:
+            client: An ``AsyncOpenAI`` client
+            **request: Arguments for ``client.embeddings.create``
+
+        Returns:
+            The parsed response
+        """
+        inputs = request["input"]
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        est_tokens = sum(num_tokens_from_text(text, request["model"]) for text in inputs)
+        return await self._create(client.embeddings.with_raw_response.create, est_tokens, request)
+
+    async def _create(self, create, est_tokens: int, request: Dict[str, Any]) -> Any:
+        """Call ``create(**request)`` within the budget, with backoff on retryable errors."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.reserve(est_tokens):
+                    raw = await create(**request)
+                self.update_from_headers(raw.headers)
+                return raw.parse()
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = min(2 ** attempt, MAX_BACKOFF) + random.random()
+                logger.warning(f"OpenAI request failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+
+# Create a singleton instance, shared by every OpenAI caller in the process
+openai_rate_limiter = RateLimiter(
+    rpm=int(os.getenv("OPENAI_RPM", 500)),
+    tpm=int(os.getenv("OPENAI_TPM", 90000))
+)
@@ -1,49 +1,104 @@
+import bisect
 import json
+import joblib
+import logging
+import tempfile
 import numpy as np
-from typing import Dict, List, Tuple, Any
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Any
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.neighbors import NearestNeighbors
+from sklearn.preprocessing import normalize
 import sqlite3
 from pathlib import Path
 import os
 
+logger = logging.getLogger(__name__)
+
+# Default to instance/app.db relative to this file
+DEFAULT_DB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    'instance',
+    'app.db'
+)
+
+# Fitted models are persisted next to the database under this name
+MODEL_CACHE_FILENAME = 'recommender.pkl'
+
 class HybridRecommender:
-    def __init__(self, db_path: str = None):
-        """Initialize the recommender with database connection."""
-        if db_path is None:
-            # Default to instance/app.db relative to this file
-            db_path = os.path.join(
-                os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-                'instance',
-                'app.db'
-            )
+    # Attributes that make up a fitted recommender
+    _STATE_ATTRS = (
+        'vectorizer', 'skills_matrix', 'job_roles', 'nsqf_levels',
+        '_nsqf_level_keys', '_job_microcreds'
+    )
+
+    def __init__(self, db_path: str = None, conn: sqlite3.Connection = None):
+        """
+        Initialize the recommender with database connection.
+        
+        Args:
+            db_path: Path to the SQLite database (default: instance/app.db),
+                or a ``file:`` URI such as a shared in-memory database
+            conn: Already-open connection to load from instead of opening
+                ``db_path``; it is left open for the caller to reuse
+        """
+        if db_path is None and conn is None:
+            db_path = DEFAULT_DB_PATH
         self.db_path = db_path
+        self._conn = conn
         self.vectorizer = TfidfVectorizer(lowercase=True, stop_words='english')
         self.job_roles = []
         self.nsqf_levels = []
         self._load_data()
         self._train_model()
 
+    @classmethod
+    def from_state(cls, db_path: str, state: Dict[str, Any]) -> 'HybridRecommender':
+        """Create a recommender from a fitted state without touching the database."""
+        recommender = cls.__new__(cls)
+        recommender.db_path = db_path
+        recommender._conn = None
+        for attr in cls._STATE_ATTRS:
+            setattr(recommender, attr, state[attr])
+        return recommender
+
+    def get_state(self) -> Dict[str, Any]:
+        """Return the fitted state, suitable for ``from_state``."""
+        return {attr: getattr(self, attr) for attr in self._STATE_ATTRS}
+
     def _get_db_connection(self):
         """Create and return a database connection."""
-        return sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(self.db_path, uri=self.db_path.startswith('file:'))
+        # WAL lets readers proceed during writes; NORMAL sync is safe with WAL
+        # and fsyncs far less
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-65536")
+        return conn
 
     def _load_data(self) -> None:
         """Load job roles and NSQF levels from the database."""
-        conn = self._get_db_connection()
+        conn = self._conn or self._get_db_connection()
         try:
+            # Row factory on the cursor, so a caller's connection is left as-is
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            
             # Load job roles
-            cursor = conn.execute('SELECT * FROM job_roles')
-            columns = [column[0] for column in cursor.description]
-            self.job_roles = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            # Rows are converted to plain dicts: sqlite3.Row has no .get() and
+            # can't be pickled into the persisted model
+            self.job_roles = [dict(row) for row in cursor.execute('SELECT * FROM job_roles')]
             
             # Load NSQF levels
-            cursor = conn.execute('SELECT * FROM nsqf_levels')
-            columns = [column[0] for column in cursor.description]
-            self.nsqf_levels = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            self.nsqf_levels = [dict(row) for row in cursor.execute('SELECT * FROM nsqf_levels')]
+            
+            # Sorted once so pathways are a bisect + slice
+            self.nsqf_levels.sort(key=lambda x: x['level'])
+            self._nsqf_level_keys = [level['level'] for level in self.nsqf_levels]
             
         finally:
-            conn.close()
+            if conn is not self._conn:
+                conn.close()
 
     def _train_model(self) -> None:
         """Train the recommendation model on job role skills."""
@@ -52,11 +107,17 @@ class HybridRecommender:
             
         # Prepare skills data for vectorization
         skills_data = [role['skills'].lower() for role in self.job_roles]
-        self.skills_matrix = self.vectorizer.fit_transform(skills_data)
+        # L2-normalised rows, so a dot product with a normalised query is the
+        # cosine similarity
+        self.skills_matrix = normalize(
+            self.vectorizer.fit_transform(skills_data), norm='l2', copy=False
+        ).tocsr()
         
-        # Initialize and fit NearestNeighbors
-        self.nn_model = NearestNeighbors(metric='cosine', n_neighbors=3, n_jobs=-1)
-        self.nn_model.fit(self.skills_matrix)
+        # Split each role's micro-credentials once, indexed like job_roles
+        self._job_microcreds = [
+            [m.strip() for m in role['suggested_microcredentials'].split(',')]
+            for role in self.job_roles
+        ]
 
     def _normalize_skills(self, skills: List[str]) -> List[str]:
         """Normalize skills by converting to lowercase and stripping whitespace."""
@@ -77,29 +138,31 @@ class HybridRecommender:
         if current_level >= target_level:
             return []
             
-        # Filter NSQF levels within the target range
-        pathway_levels = [
-            level for level in self.nsqf_levels 
-            if current_level < level['level'] <= target_level
-        ]
-        
-        # Sort by level in ascending order
-        pathway_levels.sort(key=lambda x: x['level'])
-        
-        return pathway_levels
+        # NSQF levels within the target range, already in ascending order
+        lo = bisect.bisect_right(self._nsqf_level_keys, current_level)
+        hi = bisect.bisect_right(self._nsqf_level_keys, target_level)
+        return self.nsqf_levels[lo:hi]
 
-    def _create_learning_pathway(self, job_role: Dict[str, Any], current_level: int) -> List[Dict[str, str]]:
-        """Create a 4-step learning pathway based on job role and current level."""
+    def _create_learning_pathway(self, job_idx: int, current_level: int) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        """
+        Create a 4-step learning pathway based on job role and current level.
+        
+        Returns the step descriptors and, as a parallel array, each step's base
+        duration in weeks; durations are kept separate so pace adjustment is a
+        single vector operation.
+        """
+        job_role = self.job_roles[job_idx]
         target_level = 7  # Assuming level 7 as target for professional roles
         
         # Get NSQF pathway
         nsqf_pathway = self._map_to_nsqf_pathway(current_level, target_level)
         
-        # Split suggested microcredentials
-        microcredentials = [m.strip() for m in job_role['suggested_microcredentials'].split(',')]
+        # Suggested microcredentials, split at training time
+        microcredentials = self._job_microcreds[job_idx]
         
         # Build the 4-step pathway
         pathway = []
+        durations = []
         
         # Step 1: Foundational
         if nsqf_pathway and len(nsqf_pathway) > 0:
@@ -107,10 +170,10 @@ class HybridRecommender:
                 'step': 'Foundational',
                 'title': nsqf_pathway[0]['qualification'],
                 'description': f"Build fundamental knowledge with {nsqf_pathway[0]['qualification']}",
-                'duration_weeks': 12,
                 'type': 'course',
                 'level': nsqf_pathway[0]['level']
             })
+            durations.append(12)
         
         # Step 2: Core
         if len(nsqf_pathway) > 1:
@@ -118,10 +181,10 @@ class HybridRecommender:
                 'step': 'Core',
                 'title': nsqf_pathway[-1]['qualification'],
                 'description': f"Deepen your expertise with {nsqf_pathway[-1]['qualification']}",
-                'duration_weeks': 16,
                 'type': 'course',
                 'level': nsqf_pathway[-1]['level']
             })
+            durations.append(16)
         
         # Step 3: Micro-credential
         if microcredentials:
@@ -129,22 +192,22 @@ class HybridRecommender:
                 'step': 'Micro-credential',
                 'title': microcredentials[0],
                 'description': f"Specialize with {microcredentials[0]} certification",
-                'duration_weeks': 8,
                 'type': 'certification',
                 'level': target_level
             })
+            durations.append(8)
         
         # Step 4: On-the-job/Internship
         pathway.append({
             'step': 'On-the-job/Internship',
             'title': f"{job_role['job_title']} Internship",
             'description': f"Gain practical experience as a {job_role['job_title']}",
-            'duration_weeks': 12,
             'type': 'internship',
             'level': target_level
         })
+        durations.append(12)
         
-        return pathway
+        return pathway, np.array(durations, dtype=np.int32)
 
     def _generate_explanation(self, job_role: Dict[str, Any], skill_overlap: float, demand_score: int) -> str:
         """Generate an explanation for the recommendation."""
@@ -167,34 +230,82 @@ class HybridRecommender:
         Returns:
             Dict containing recommended pathways and explanations
         """
+        return self.compute_batch([profile])[0]
+
+    def compute_batch(self, profiles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Compute recommendations for several profiles at once.
+        
+        All profiles are vectorized with one ``transform`` call and scored
+        against every job role with one sparse matrix product, which amortizes
+        the per-call overhead when requests are batched.
+        
+        Args:
+            profiles: List of profile dictionaries (see ``compute_recommendations``)
+            
+        Returns:
+            List of recommendation dicts, in the same order as ``profiles``
+            
+        Raises:
+            ValueError: If any profile has no skills
+        """
         # Normalize inputs
-        normalized_skills = self._normalize_skills(profile.get('prior_skills', []))
+        normalized = [
+            self._normalize_skills(profile.get('prior_skills', []))
+            for profile in profiles
+        ]
         
-        if not normalized_skills:
+        if not all(normalized):
             raise ValueError("No skills provided in the profile")
         
         # Prepare user skills for prediction
-        user_skills_text = ', '.join(normalized_skills)
-        user_vector = self.vectorizer.transform([user_skills_text])
+        user_vectors = normalize(self.vectorizer.transform([
+            ', '.join(normalized_skills) for normalized_skills in normalized
+        ]))
         
-        # Find nearest job roles
-        distances, indices = self.nn_model.kneighbors(user_vector, n_neighbors=3)
+        # Cosine similarity of every profile to every job role
+        similarities = (user_vectors @ self.skills_matrix.T).toarray()
         
+        # Pick the 3 most similar job roles per profile; argpartition finds them
+        # in linear time and only those are sorted
+        k = min(3, similarities.shape[1])
+        if k < similarities.shape[1]:
+            candidates = np.argpartition(-similarities, k, axis=1)[:, :k]
+        else:
+            candidates = np.tile(np.arange(k), (len(profiles), 1))
+        candidate_sims = np.take_along_axis(similarities, candidates, axis=1)
+        order = np.argsort(-candidate_sims, axis=1, kind='stable')
+        indices = np.take_along_axis(candidates, order, axis=1)
+        scores = np.take_along_axis(candidate_sims, order, axis=1)
+        
+        return [
+            self._build_recommendations(profile, normalized_skills, indices[i], scores[i])
+            for i, (profile, normalized_skills) in enumerate(zip(profiles, normalized))
+        ]
+
+    def _build_recommendations(
+        self,
+        profile: Dict[str, Any],
+        normalized_skills: List[str],
+        indices: np.ndarray,
+        similarities: np.ndarray
+    ) -> Dict[str, Any]:
+        """Build the recommendation payload for one profile from its nearest job roles."""
         recommendations = []
         
-        for idx, distance in zip(indices[0], distances[0]):
+        for idx, similarity in zip(indices, similarities):
             job_role = self.job_roles[idx]
             
             # Calculate scores
-            skill_overlap = 1 - distance  # Convert cosine distance to similarity
+            skill_overlap = similarity  # Cosine similarity
             demand_score = job_role.get('demand_score', 50)  # Default to 50 if not available
             
             # Calculate combined score (weighted average)
             combined_score = (skill_overlap * 0.6) + (demand_score / 100 * 0.4)
             
             # Create learning pathway
-            pathway = self._create_learning_pathway(
-                job_role,
+            pathway, durations = self._create_learning_pathway(
+                idx,
                 profile.get('education_level', 1)  # Default to level 1 if not specified
             )
             
@@ -205,8 +316,9 @@ class HybridRecommender:
                 'fast': 0.7
             }.get(profile.get('learning_pace', 'normal'), 1.0)
             
-            for step in pathway:
-                step['duration_weeks'] = int(step['duration_weeks'] * pace_multiplier)
+            durations = (durations * pace_multiplier).astype(np.int32)
+            for step, weeks in zip(pathway, durations.tolist()):
+                step['duration_weeks'] = weeks
             
             # Generate explanation
             explanation = self._generate_explanation(job_role, skill_overlap, demand_score)
@@ -230,6 +342,94 @@ class HybridRecommender:
             }
         }
 
+@lru_cache(maxsize=4)
+def _get_recommender(db_path: str, db_mtime: Optional[float]) -> HybridRecommender:
+    """
+    Build (or load) the recommender for a database version.
+    
+    Keyed on the database's mtime, so a changed database gets a fresh model.
+    The fitted state is persisted next to the database and reused across
+    process restarts while the database is unchanged. Databases without a
+    file (``db_mtime`` is None) are only cached in memory.
+    """
+    if db_mtime is None:
+        return HybridRecommender(db_path)
+    
+    model_path = os.path.join(os.path.dirname(db_path), MODEL_CACHE_FILENAME)
+    try:
+        cached = joblib.load(model_path)
+        if cached['db_path'] == db_path and cached['db_mtime'] == db_mtime:
+            return HybridRecommender.from_state(db_path, cached['state'])
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Error loading cached recommender model: {e}")
+    
+    recommender = HybridRecommender(db_path)
+    _save_model(model_path, {'db_path': db_path, 'db_mtime': db_mtime, 'state': recommender.get_state()})
+    return recommender
+
+def _save_model(model_path: str, payload: Dict[str, Any]) -> None:
+    """
+    Persist ``payload`` to ``model_path`` atomically.
+    
+    The model is written to a temporary file in the same directory and moved
+    into place, so concurrent workers never read a partially written file.
+    Failures are logged and otherwise ignored; the model is only a cache.
+    """
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(model_path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            joblib.dump(payload, f)
+        os.replace(tmp_path, model_path)
+    except Exception as e:
+        logger.warning(f"Error saving recommender model: {e}")
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+# Database files already switched to WAL by _enable_wal
+_wal_db_paths = set()
+
+def _enable_wal(db_path: str) -> None:
+    """
+    Switch a database file to WAL mode, once per process.
+    
+    The switch rewrites the file header and so bumps its mtime; doing it
+    before the cache key is read keeps the recommender's own connection from
+    invalidating the model it was just fitted for.
+    """
+    if db_path in _wal_db_paths:
+        return
+    # mode=rw so a missing database is an error rather than a new empty file
+    conn = sqlite3.connect(f"{Path(db_path).as_uri()}?mode=rw", uri=True)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+    finally:
+        conn.close()
+    _wal_db_paths.add(db_path)
+
+def get_recommender(db_path: str = None) -> HybridRecommender:
+    """
+    Return the shared recommender for ``db_path`` (default: instance/app.db).
+    
+    The fitted models are read-only after construction, so one instance can
+    serve every request; it is rebuilt when the database file changes.
+    ``file:`` URIs are cached by URI alone, as they have no mtime to check.
+    """
+    db_path = db_path or DEFAULT_DB_PATH
+    if db_path.startswith('file:'):
+        return _get_recommender(db_path, None)
+    
+    db_path = os.path.abspath(db_path)
+    _enable_wal(db_path)
+    db_mtime = os.path.getmtime(db_path)
+    # In WAL mode recent writes live in the -wal file until checkpointed
+    wal_path = db_path + '-wal'
+    if os.path.exists(wal_path):
+        db_mtime = max(db_mtime, os.path.getmtime(wal_path))
+    return _get_recommender(db_path, db_mtime)
+
 def compute_recommendations(profile: Dict[str, Any], db_path: str = None) -> Dict[str, Any]:
     """
     Convenience function to get recommendations without instantiating the class.
@@ -241,5 +441,4 @@ def compute_recommendations(profile: Dict[str, Any], db_path: str = None) -> Dic
     Returns:
         Dictionary with recommendations
     """
-    recommender = HybridRecommender(db_path)
-    return recommender.compute_recommendations(profile)
+    return get_recommender(db_path).compute_recommendations(profile)
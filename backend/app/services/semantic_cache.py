@@ -0,0 +1,140 @@
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+
+# Try to import sentence-transformers, but make it optional
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+
+class _Partition:
+    """Embeddings and cached responses for a single partition key."""
+
+    def __init__(self, dim: int, capacity: int = 8):
+        # Rows [0, size) are in use; capacity doubles when full so appends
+        # are amortised O(1) instead of copying the matrix every time
+        self.embeddings = np.empty((capacity, dim), dtype=np.float32)
+        self.size = 0
+        self.context_hashes: List[str] = []
+        self.responses: List[str] = []
+
+    def append(self, embedding: np.ndarray, context_hash: str, response: str) -> None:
+        if self.size == self.embeddings.shape[0]:
+            grown = np.empty((self.size * 2, self.embeddings.shape[1]), dtype=np.float32)
+            grown[:self.size] = self.embeddings[:self.size]
+            self.embeddings = grown
+        self.embeddings[self.size] = embedding
+        self.size += 1
+        self.context_hashes.append(context_hash)
+        self.responses.append(response)
+
+    def drop_oldest(self, count: int) -> None:
+        self.embeddings[:self.size - count] = self.embeddings[count:self.size]
+        self.size -= count
+        del self.context_hashes[:count]
+        del self.responses[:count]
+
+
+class SemanticCache:
+    """
+    Semantic response cache for chat messages.
+
+    Entries are partitioned (e.g. by profile ID) and matched on the cosine
+    similarity of L2-normalised message embeddings. A hit additionally requires
+    the context hash to match, so the same question asked against a different
+    profile or set of recommendations is never served a stale answer.
+
+    Callers pass embeddings in, so any embedding model can be used as long as
+    one cache instance always sees the same model. ``embed`` provides a local
+    embedding: sentence-transformers when installed, otherwise a hashed
+    word/bigram vector which needs no fitting.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        max_entries: int = 256,
+        max_partitions: int = 1024,
+        model_name: str = "all-MiniLM-L6-v2"
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_partitions = max_partitions
+        self.model_name = model_name
+        self._model = None
+        self._hasher = HashingVectorizer(
+            n_features=2 ** 14,
+            ngram_range=(1, 2),
+            alternate_sign=False,
+            norm="l2"
+        )
+        self._partitions: "OrderedDict[Hashable, _Partition]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def embed(self, text: str) -> np.ndarray:
+        """Return a local L2-normalised embedding for ``text``."""
+        text = text.strip().lower()
+        if SENTENCE_TRANSFORMERS_AVAILABLE:
+            if self._model is None:
+                self._model = SentenceTransformer(self.model_name)
+            return self._model.encode(text, normalize_embeddings=True).astype(np.float32)
+        return self._hasher.transform([text]).toarray()[0].astype(np.float32)
+
+    @staticmethod
+    def context_hash(context: Optional[Dict]) -> str:
+        """Stable hash of the request context (profile, recommendations)."""
+        payload = json.dumps(context or {}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, partition_key: Hashable, embedding: np.ndarray, context_hash: str) -> Optional[str]:
+        """Return a cached response for a semantically equivalent message, if any."""
+        partition = self._partitions.get(partition_key)
+        if partition is None or partition.size == 0:
+            self.stats["misses"] += 1
+            return None
+
+        self._partitions.move_to_end(partition_key)
+        # One matrix-vector product scores every cached message
+        sims = partition.embeddings[:partition.size] @ embedding
+        # Only consider entries recorded against the same context
+        for i in np.argsort(-sims):
+            if sims[i] < self.threshold:
+                break
+            if partition.context_hashes[i] == context_hash:
+                self.stats["hits"] += 1
+                return partition.responses[i]
+
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, partition_key: Hashable, embedding: np.ndarray, context_hash: str, response: str) -> None:
+        """Store a response for the message ``embedding`` under the given partition and context."""
+        partition = self._partitions.get(partition_key)
+        if partition is None:
+            partition = self._partitions[partition_key] = _Partition(embedding.shape[0])
+            if len(self._partitions) > self.max_partitions:
+                self._partitions.popitem(last=False)
+        else:
+            self._partitions.move_to_end(partition_key)
+
+        partition.append(embedding, context_hash, response)
+
+        # Drop the oldest entries once the partition is full
+        overflow = partition.size - self.max_entries
+        if overflow > 0:
+            partition.drop_oldest(overflow)
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        self._partitions.clear()
+
+
+# Create a singleton instance
+semantic_cache = SemanticCache(threshold=0.92)
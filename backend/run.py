@@ -20,12 +20,21 @@ if __name__ == "__main__":
     # Get port from environment variable or use default 8000
     port = int(os.getenv("PORT", 8000))
     
-    # Run the FastAPI application
+    # reload (a file watcher plus supervisor process) is for development
+    # only; production runs WEB_CONCURRENCY workers (default 2 * CPUs + 1)
+    reload = os.getenv("ENV") == "development"
+    workers = 1 if reload else int(
+        os.getenv("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1)
+    )
+    
+    # Run the FastAPI application; uvicorn picks uvloop + httptools when
+    # installed (uvicorn[standard]) and falls back to asyncio/h11 otherwise
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=port,
-        reload=True,
-        reload_dirs=[str(Path(__file__).parent / "app")],
-        workers=1 if os.getenv("ENV") == "development" else None
+        reload=reload,
+        reload_dirs=[str(Path(__file__).parent / "app")] if reload else None,
+        workers=workers,
+        log_level="info"
     )
@@ -2,11 +2,13 @@ import sys
 import os
 from pathlib import Path
 
+BASE_DIR = Path(__file__).resolve().parent.parent
+
 # Add the backend directory to the Python path
-sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(BASE_DIR))
 
 from sqlalchemy.orm import Session
-from app.database import engine, Base
+from app.database import engine, Base, SessionLocal
 from app.models import NSQFCourse
 
 def init_db():
@@ -14,9 +16,8 @@ def init_db():
     # Create all tables
     Base.metadata.create_all(bind=engine)
     
-    # Create a new session
-    from sqlalchemy.orm import sessionmaker
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    # Use the app's session factory, so the script shares its engine's
+    # connection pool instead of building another one
     db = SessionLocal()
     
     try:
@@ -56,10 +57,9 @@ def init_db():
                 }
             ]
             
-            # Add courses to database
-            for course_data in nsqf_courses:
-                course = NSQFCourse(**course_data)
-                db.add(course)
+            # Add courses to database in one executemany, skipping the
+            # per-object unit-of-work bookkeeping
+            db.bulk_insert_mappings(NSQFCourse, nsqf_courses)
             
             db.commit()
             print("✅ Database initialized with sample data")
@@ -1,17 +1,110 @@
 import os
+import sys
 import json
 import csv
+import shutil
 import sqlite3
+import subprocess
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Sequence
+
+# Try to import ijson, but make it optional
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
 
 # Database configuration
-DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'app.db')
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+BASE_DIR = Path(__file__).resolve().parent.parent
+DB_PATH = BASE_DIR / 'instance' / 'app.db'
+DATA_DIR = BASE_DIR / 'data'
+
+NSQF_JSON = DATA_DIR / 'nsqf.json'
+JOB_ROLES_CSV = DATA_DIR / 'job_roles.csv'
+JOB_ROLES_COLUMNS = ('job_title', 'skills', 'demand_score', 'suggested_microcredentials')
+JOB_ROLES_STAGING = 'job_roles_staging'
+
+# SQLite's default limit on bound parameters per statement
+SQLITE_MAX_VARIABLES = 999
+
+def bulk_insert(
+    conn: sqlite3.Connection,
+    table: str,
+    cols: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    chunk: int = 100,
+    replace: bool = False
+) -> int:
+    """
+    Insert rows using multi-row ``INSERT ... VALUES (...), (...)`` statements.
+    
+    Rows are sent ``chunk`` at a time (capped so a statement stays within
+    SQLite's parameter limit), which cuts per-row statement overhead compared
+    to executemany. With ``replace``, rows that collide with an existing
+    UNIQUE key overwrite it (``INSERT OR REPLACE``).
+    
+    Returns:
+        Number of rows inserted
+    """
+    chunk = max(1, min(chunk, SQLITE_MAX_VARIABLES // len(cols)))
+    placeholder = "(" + ",".join("?" * len(cols)) + ")"
+    verb = "INSERT OR REPLACE" if replace else "INSERT"
+    prefix = f"{verb} INTO {table} ({', '.join(cols)}) VALUES "
+    full_sql = prefix + ",".join([placeholder] * chunk)
+    
+    rows = iter(rows)
+    count = 0
+    while True:
+        batch = list(islice(rows, chunk))
+        if not batch:
+            break
+        sql = full_sql if len(batch) == chunk else prefix + ",".join([placeholder] * len(batch))
+        conn.execute(sql, [value for row in batch for value in row])
+        count += len(batch)
+    return count
+
+# Connection settings for fast bulk loading. WAL + NORMAL only fsyncs at
+# checkpoints and stays crash-safe; SEED_UNSAFE=1 trades durability for speed
+# on disposable dev databases.
+SEED_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-64000;
+"""
 
-def create_tables(conn: sqlite3.Connection) -> None:
+UNSAFE_SEED_PRAGMAS = """
+PRAGMA journal_mode=MEMORY;
+PRAGMA synchronous=OFF;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-64000;
+"""
+
+# Shared connection, opened lazily by get_conn()
+_conn = None
+
+def get_conn() -> sqlite3.Connection:
+    """Return the script's shared connection, opening it with the seed PRAGMAs on first use."""
+    global _conn
+    if _conn is None:
+        # Create database directory if it doesn't exist
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _conn = sqlite3.connect(str(DB_PATH))
+        _conn.executescript(UNSAFE_SEED_PRAGMAS if os.getenv('SEED_UNSAFE') == '1' else SEED_PRAGMAS)
+    return _conn
+
+def close_conn() -> None:
+    """Close the shared connection; the next get_conn() reopens it."""
+    global _conn
+    if _conn is not None:
+        _conn.close()
+        _conn = None
+
+def create_tables() -> None:
     """Create necessary tables if they don't exist."""
-    cursor = conn.cursor()
+    cursor = get_conn().cursor()
     
     # Create NSQF levels table
     cursor.execute('''
@@ -35,78 +128,183 @@ def create_tables(conn: sqlite3.Connection) -> None:
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )
     ''')
-    
-    conn.commit()
 
-def seed_nsqf_levels(conn: sqlite3.Connection) -> None:
-    """Seed NSQF levels data from JSON file."""
-    json_file = os.path.join(DATA_DIR, 'nsqf.json')
-    
-    with open(json_file, 'r', encoding='utf-8') as f:
-        nsqf_data = json.load(f)
-    
-    cursor = conn.cursor()
+# Unique keys the seeders' INSERT OR REPLACE upserts on: table -> (index, columns)
+SEED_INDEXES = {
+    # Lookups by job title; one row per title
+    'job_roles': ('idx_job_roles_title', ('job_title',)),
+    # Lookups by level (leading column); one row per qualification per level
+    'nsqf_levels': ('idx_nsqf_levels_level', ('level', 'qualification')),
+}
+
+def populated_tables() -> List[str]:
+    """Return the seed tables that already exist and hold rows."""
+    conn = get_conn()
+    existing = {
+        name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    }
+    return [
+        table for table in SEED_INDEXES
+        if table in existing and conn.execute(f'SELECT 1 FROM {table} LIMIT 1').fetchone()
+    ]
+
+def create_indexes(tables: Iterable[str] = SEED_INDEXES) -> None:
+    """
+    Create the seed tables' unique indexes.
     
-    # Clear existing data
-    cursor.execute('DELETE FROM nsqf_levels')
+    Building an index over loaded rows is cheaper than updating it on every
+    insert, so a table created by this run is indexed after its load. A table
+    that already holds rows must be indexed before it, or the upserts have no
+    key to replace on and append duplicates instead.
+    """
+    cursor = get_conn().cursor()
+    for table in tables:
+        index, cols = SEED_INDEXES[table]
+        cursor.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS {index} ON {table}({", ".join(cols)})')
+
+def remove_duplicate_rows(tables: Iterable[str]) -> None:
+    """
+    Delete rows that repeat a table's unique key, keeping the newest.
     
-    # Insert new data
-    for item in nsqf_data:
+    Databases seeded before the upserts can hold such rows, which would stop
+    the unique index from being built.
+    """
+    cursor = get_conn().cursor()
+    for table in tables:
+        _, cols = SEED_INDEXES[table]
         cursor.execute(
-            'INSERT INTO nsqf_levels (level, qualification, example_courses) VALUES (?, ?, ?)',
+            f'DELETE FROM {table} WHERE id NOT IN '
+            f'(SELECT MAX(id) FROM {table} GROUP BY {", ".join(cols)})'
+        )
+
+def iter_json_items(f) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the elements of a top-level JSON array.
+    
+    Streams with ijson when installed so memory stays constant for large
+    files; otherwise falls back to json.load.
+    """
+    if IJSON_AVAILABLE:
+        # use_float keeps numbers as int/float rather than Decimal
+        yield from ijson.items(f, 'item', use_float=True)
+    else:
+        yield from json.load(f)
+
+def seed_nsqf_levels() -> None:
+    """Seed NSQF levels data from JSON file."""
+    # Stream items straight into the upserts (committed by main)
+    with open(NSQF_JSON, 'rb') as f:
+        rows = (
             (item['level'], item['qualification'], ', '.join(item['example_courses']))
+            for item in iter_json_items(f)
+        )
+        count = bulk_insert(
+            get_conn(), 'nsqf_levels', ('level', 'qualification', 'example_courses'), rows, chunk=500, replace=True
         )
     
-    conn.commit()
-    print(f"Seeded {len(nsqf_data)} NSQF levels")
+    print(f"Seeded {count} NSQF levels")
 
-def seed_job_roles(conn: sqlite3.Connection) -> None:
-    """Seed job roles data from CSV file."""
-    csv_file = os.path.join(DATA_DIR, 'job_roles.csv')
+def import_csv_with_cli(csv_file: Path, table: str, cols: Sequence[str]) -> bool:
+    """
+    Load a CSV file into a fresh all-TEXT staging table with the sqlite3 CLI.
+    
+    The CLI's ``.import`` is much faster than inserting rows from Python for
+    large files. This must run while no other connection holds a write
+    transaction on the database.
     
-    with open(csv_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        job_roles = list(reader)
+    Returns:
+        True if the table was loaded, False if the CLI is missing or failed
+    """
+    sqlite3_cli = shutil.which('sqlite3')
+    if not sqlite3_cli:
+        return False
     
-    cursor = conn.cursor()
+    script = (
+        f"DROP TABLE IF EXISTS {table};\n"
+        f"CREATE TABLE {table} ({', '.join(f'{col} TEXT' for col in cols)});\n"
+        ".mode csv\n"
+        f'.import --skip 1 "{csv_file}" {table}\n'
+    )
+    result = subprocess.run(
+        [sqlite3_cli, '-bail', str(DB_PATH)], input=script, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(f"sqlite3 .import failed, falling back to Python inserts: {result.stderr.strip()}")
+        return False
+    return True
+
+def seed_job_roles(staged: bool = False) -> None:
+    """
+    Seed job roles data from CSV file.
     
-    # Clear existing data
-    cursor.execute('DELETE FROM job_roles')
+    Args:
+        staged: Copy rows from the staging table filled by import_csv_with_cli
+            instead of parsing the CSV in Python
+    """
+    cursor = get_conn().cursor()
     
-    # Insert new data
-    for role in job_roles:
-        cursor.execute(
-            'INSERT INTO job_roles (job_title, skills, demand_score, suggested_microcredentials) VALUES (?, ?, ?, ?)',
-            (role['job_title'], role['skills'], int(role['demand_score']), role['suggested_microcredentials'])
-        )
+    # Upsert on job_title (committed by main)
+    if staged:
+        cursor.execute(f'''
+        INSERT OR REPLACE INTO job_roles (job_title, skills, demand_score, suggested_microcredentials)
+        SELECT job_title, skills, CAST(demand_score AS INTEGER), suggested_microcredentials
+        FROM {JOB_ROLES_STAGING}
+        ''')
+        count = cursor.rowcount
+        cursor.execute(f'DROP TABLE {JOB_ROLES_STAGING}')
+    else:
+        with open(JOB_ROLES_CSV, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            next(reader)  # skip header
+            # The whole file goes in as one JSON array bound to a single
+            # parameter; SQLite unpacks it with json_each in one statement
+            payload = json.dumps(list(reader))
+        # Columns: job_title, skills, demand_score, suggested_microcredentials
+        cursor.execute('''
+        INSERT OR REPLACE INTO job_roles (job_title, skills, demand_score, suggested_microcredentials)
+        SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]'),
+               CAST(json_extract(value, '$[2]') AS INTEGER), json_extract(value, '$[3]')
+        FROM json_each(?)
+        ''', (payload,))
+        count = cursor.rowcount
     
-    conn.commit()
-    print(f"Seeded {len(job_roles)} job roles")
+    print(f"Seeded {count} job roles")
 
 def main():
     # Create data directory if it doesn't exist
-    os.makedirs(DATA_DIR, exist_ok=True)
-    
-    # Create database directory if it doesn't exist
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
     
     # Connect to SQLite database
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_conn()
     
     try:
-        # Create tables
-        create_tables(conn)
+        # Bulk-load the CSV with the sqlite3 CLI when available; this has to
+        # happen before our own write transaction takes the database lock
+        staged = import_csv_with_cli(JOB_ROLES_CSV, JOB_ROLES_STAGING, JOB_ROLES_COLUMNS)
         
-        # Seed data
-        seed_nsqf_levels(conn)
-        seed_job_roles(conn)
+        # Create tables and seed data in one transaction: `with conn` commits
+        # once on success and rolls everything back on error
+        with conn:
+            conn.execute('BEGIN')
+            populated = populated_tables()
+            remove_duplicate_rows(populated)
+            create_indexes(populated)
+            create_tables()
+            seed_nsqf_levels()
+            seed_job_roles(staged=staged)
+            create_indexes()
         
         print("Database seeding completed successfully!")
     except Exception as e:
         print(f"Error seeding database: {e}")
-        conn.rollback()
+        # Fail the calling shell, CI or deploy step
+        sys.exit(1)
     finally:
-        conn.close()
+        # The CLI creates the staging table outside our transaction, so a
+        # rollback leaves it behind
+        conn.execute(f'DROP TABLE IF EXISTS {JOB_ROLES_STAGING}')
+        conn.commit()
+        close_conn()
 
 if __name__ == "__main__":
     main()
@@ -1,14 +1,35 @@
-from setuptools import setup, find_packages
+from setuptools import setup
 
-# Read requirements from requirements.txt
+# Read requirements from requirements.txt, skipping blank lines and
+# comments and dropping repeated entries
 with open('requirements.txt') as f:
-    requirements = f.read().splitlines()
+    requirements = list(dict.fromkeys(
+        line.strip() for line in f
+        if line.strip() and not line.lstrip().startswith('#')
+    ))
 
 setup(
     name="learning_path_backend",
     version="0.1.0",
-    packages=find_packages(),
+    # Listed explicitly: no directory scan at install time, and it picks up
+    # the subpackages that have no __init__.py (api, db, services)
+    packages=[
+        'app',
+        'app.api',
+        'app.api.endpoints',
+        'app.db',
+        'app.models',
+        'app.schemas',
+        'app.services',
+    ],
     install_requires=requirements,
+    extras_require={
+        'test': [
+            'pytest>=7.0.0',
+            'pytest-cov',
+            'pytest-xdist',
+        ],
+    },
     python_requires='>=3.8',
     author="Your Name",
     author_email="your.email@example.com",
@@ -1,3 +1,3 @@
 #!/bin/bash
 cd /app
-python -m uvicorn app.main:app --host 0.0.0.0 --port $PORT
+python -m uvicorn app.main:app --host 0.0.0.0 --port $PORT --limit-concurrency 200 --backlog 2048
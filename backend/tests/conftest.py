@@ -1,6 +1,4 @@
-import os
 import sys
-import tempfile
 import pytest
 import sqlite3
 from pathlib import Path
@@ -10,31 +8,30 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 @pytest.fixture(scope="session")
 def test_db_path():
-    """Create a test database with sample data."""
-    # Create a temporary database
-    fd, path = tempfile.mkstemp(suffix='.db')
+    """Create an in-memory test database with sample data and yield its URI."""
+    # A named shared-cache memory database is visible to every connection
+    # opened with this URI, and lives as long as one of them stays open
+    uri = "file:conftest_mem?mode=memory&cache=shared"
     
-    conn = sqlite3.connect(path)
+    conn = sqlite3.connect(uri, uri=True)
     cursor = conn.cursor()
     
-    # Create tables
-    cursor.execute('''
+    # Create tables in one script
+    cursor.executescript('''
     CREATE TABLE IF NOT EXISTS job_roles (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         job_title TEXT NOT NULL,
         skills TEXT NOT NULL,
         demand_score INTEGER NOT NULL,
         suggested_microcredentials TEXT NOT NULL
-    )
-    ''')
+    );
     
-    cursor.execute('''
     CREATE TABLE IF NOT EXISTS nsqf_levels (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         level INTEGER NOT NULL,
         qualification TEXT NOT NULL,
         example_courses TEXT NOT NULL
-    )
+    );
     ''')
     
     # Insert test data
@@ -61,15 +58,26 @@ def test_db_path():
     )
     
     conn.commit()
-    conn.close()
     
-    yield path
+    yield uri
     
-    # Cleanup
-    try:
-        os.unlink(path)
-    except:
-        pass
+    # Cleanup: closing the last connection frees the database
+    conn.close()
+
+@pytest.fixture(scope="session")
+def test_db_conn(test_db_path):
+    """Share one read-only connection to the test database across the session."""
+    conn = sqlite3.connect(test_db_path, uri=True, check_same_thread=False)
+    # mode=ro can't be combined with mode=memory, so guard writes per connection
+    conn.execute("PRAGMA query_only=ON")
+    yield conn
+    conn.close()
+
+@pytest.fixture(scope="session")
+def recommender(test_db_path):
+    """A recommender fitted once on the test database and shared by read-only tests."""
+    from app.services.recommender import HybridRecommender
+    return HybridRecommender(test_db_path)
 
 @pytest.fixture
 def sample_profile():
@@ -80,3 +88,28 @@ def sample_profile():
         'aspirations': 'I want to become a data scientist',
         'learning_pace': 'normal'
     }
+
+@pytest.fixture(autouse=True)
+def clear_recommender_cache():
+    """Don't let a recommender cached (or mocked) in one test leak into the next."""
+    from app.services.recommender import _get_recommender
+    _get_recommender.cache_clear()
+    yield
+    _get_recommender.cache_clear()
+
+@pytest.fixture
+def db_session():
+    """A session on a fresh in-memory database with the app's ORM tables."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from app.database import Base
+    import app.models  # noqa: F401 - registers the models on Base
+    
+    # StaticPool keeps the single in-memory connection for the whole test
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
@@ -0,0 +1,179 @@
+import asyncio
+import json
+import pytest
+from types import SimpleNamespace
+from fastapi import HTTPException
+from app.models import LearningPath, User
+from app.models.learning_path import LearningPathGenerationMode
+from app.services import learning_path_service
+from app.services.learning_path_service import (
+    generate_learning_path,
+    generate_learning_paths,
+    enqueue_learning_path_batch,
+    process_learning_path_batch,
+    poll_learning_path_batches,
+)
+
+AI_CONTENT = json.dumps({"items": [
+    {
+        "item_type": "video",
+        "title": "SQL in 10 minutes",
+        "description": "A quick tour of SQL.",
+        "resource_url": "",
+        "estimated_duration": 10,
+        "order": 0
+    },
+    {
+        "item_type": "project",
+        "title": "Build a reporting query",
+        "description": "Write joins and aggregates.",
+        "resource_url": "",
+        "estimated_duration": 120,
+        "order": 1
+    }
+]})
+
+class FakeBatchClient:
+    """Stands in for the OpenAI client's files and batches APIs."""
+    
+    def __init__(self):
+        self.status = "in_progress"
+        self.output = {}
+        self.submitted = []
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+    
+    def _create_file(self, file, purpose):
+        self.submitted.append([json.loads(line) for line in file[1].decode("utf-8").splitlines()])
+        return SimpleNamespace(id=f"file-{len(self.submitted)}")
+    
+    def _create_batch(self, input_file_id, endpoint, completion_window):
+        return SimpleNamespace(id=f"batch-{len(self.submitted)}")
+    
+    def _retrieve_batch(self, batch_id):
+        output_file_id = "out-1" if self.status == "completed" else None
+        return SimpleNamespace(id=batch_id, status=self.status, output_file_id=output_file_id)
+    
+    def _file_content(self, file_id):
+        lines = [
+            json.dumps({
+                "custom_id": custom_id,
+                "response": {
+                    "status_code": 200,
+                    "body": {"choices": [{"message": {"content": content}}]}
+                }
+            })
+            for custom_id, content in self.output.items()
+        ]
+        return SimpleNamespace(text="\n".join(lines))
+
+@pytest.fixture
+def fake_batch_client(monkeypatch):
+    """Route the service's Batch API calls to a fake client."""
+    client = FakeBatchClient()
+    monkeypatch.setattr(learning_path_service, "batch_client", client)
+    return client
+
+@pytest.fixture
+def users(db_session):
+    """Two users to generate learning paths for."""
+    users = [User(email=f"user{i}@example.com", hashed_password="x") for i in range(2)]
+    db_session.add_all(users)
+    db_session.commit()
+    return users
+
+def test_generate_without_openai(monkeypatch):
+    """Test that generation falls back to the default path when OpenAI is not configured."""
+    monkeypatch.setattr(learning_path_service, "_client", None)
+    path = asyncio.run(generate_learning_path(user_id=1, topic=" SQL ", current_level="Expert"))
+    
+    assert path.title == "Sql Learning Path"
+    assert "beginner" in path.description
+    assert [item.title for item in path.items] == ["Introduction to SQL"]
+
+def test_generate_rejects_short_topic():
+    """Test that a missing topic is a 400, not a default path."""
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(generate_learning_path(user_id=1, topic=" "))
+    assert exc_info.value.status_code == 400
+
+def test_generate_many_keeps_request_order(monkeypatch):
+    """Test that concurrent generation returns paths in request order."""
+    monkeypatch.setattr(learning_path_service, "_client", None)
+    paths = asyncio.run(generate_learning_paths([
+        {"user_id": 1, "topic": "SQL"},
+        {"user_id": 2, "topic": "Python", "current_level": "advanced"},
+    ]))
+    
+    assert [path.title for path in paths] == ["Sql Learning Path", "Python Learning Path"]
+
+def test_enqueue_creates_placeholder_paths(db_session, users, fake_batch_client):
+    """Test that enqueueing submits one batch and stores a default path per request."""
+    batch_id = enqueue_learning_path_batch(db_session, [
+        {"user_id": users[0].id, "topic": "SQL"},
+        {"user_id": users[1].id, "topic": "Python", "current_level": "advanced"},
+        {"user_id": users[0].id, "topic": "sql"},  # Same request as the first
+    ])
+    
+    assert batch_id == "batch-1"
+    assert len(fake_batch_client.submitted[0]) == 2
+    paths = db_session.query(LearningPath).all()
+    assert len(paths) == 2
+    for path in paths:
+        assert path.generation_mode == LearningPathGenerationMode.BATCH
+        assert path.batch_id == batch_id
+        assert len(path.items) == 1
+    
+    # Requests with a pending batch path are not submitted again
+    assert enqueue_learning_path_batch(db_session, [{"user_id": users[0].id, "topic": "SQL"}]) is None
+    assert len(fake_batch_client.submitted) == 1
+
+def test_process_pending_batch(db_session, users, fake_batch_client):
+    """Test that a batch that is still running is left alone."""
+    batch_id = enqueue_learning_path_batch(db_session, [{"user_id": users[0].id, "topic": "SQL"}])
+    
+    assert process_learning_path_batch(db_session, batch_id) is False
+    assert db_session.query(LearningPath).one().batch_id == batch_id
+
+def test_process_completed_batch(db_session, users, fake_batch_client):
+    """Test that results replace the default items, and failed requests keep them."""
+    batch_id = enqueue_learning_path_batch(db_session, [
+        {"user_id": users[0].id, "topic": "SQL"},
+        {"user_id": users[1].id, "topic": "Python"},
+    ])
+    sql_id, python_id = [line["custom_id"] for line in fake_batch_client.submitted[0]]
+    fake_batch_client.status = "completed"
+    fake_batch_client.output = {sql_id: AI_CONTENT, python_id: "not json"}
+    
+    assert process_learning_path_batch(db_session, batch_id) is True
+    
+    sql_path = db_session.query(LearningPath).filter(LearningPath.user_id == users[0].id).one()
+    python_path = db_session.query(LearningPath).filter(LearningPath.user_id == users[1].id).one()
+    assert [item.title for item in sql_path.items] == ["SQL in 10 minutes", "Build a reporting query"]
+    assert [item.title for item in python_path.items] == ["Introduction to Python"]
+    for path in (sql_path, python_path):
+        assert path.batch_id is None
+        assert path.batch_custom_id is None
+
+def test_poll_counts_finished_batches(db_session, users, fake_batch_client):
+    """Test that polling processes finished batches only."""
+    enqueue_learning_path_batch(db_session, [{"user_id": users[0].id, "topic": "SQL"}])
+    enqueue_learning_path_batch(db_session, [{"user_id": users[1].id, "topic": "Python"}])
+    
+    assert poll_learning_path_batches(db_session) == 0
+    
+    fake_batch_client.status = "completed"
+    assert poll_learning_path_batches(db_session) == 2
+    assert poll_learning_path_batches(db_session) == 0
+
+@pytest.mark.parametrize("call", [
+    lambda db: enqueue_learning_path_batch(db, [{"user_id": 1, "topic": "SQL"}]),
+    lambda db: process_learning_path_batch(db, "batch-1"),
+    lambda db: poll_learning_path_batches(db),
+])
+def test_batch_requires_openai(db_session, monkeypatch, call):
+    """Test that batch functions fail with 503 when OpenAI is not configured."""
+    monkeypatch.setattr(learning_path_service, "batch_client", None)
+    with pytest.raises(HTTPException) as exc_info:
+        call(db_session)
+    assert exc_info.value.status_code == 503
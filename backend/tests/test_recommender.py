@@ -1,49 +1,42 @@
 import pytest
 import os
 import json
+import sqlite3
 from unittest.mock import MagicMock, patch
 from app.services.recommender import HybridRecommender, compute_recommendations
 
-def test_hybrid_recommender_initialization(test_db_path):
-    """Test that the recommender initializes correctly with a test database."""
-    recommender = HybridRecommender(test_db_path)
+def test_hybrid_recommender_initialization(test_db_conn):
+    """Test that the recommender initializes correctly from an open test database connection."""
+    recommender = HybridRecommender(conn=test_db_conn)
     assert len(recommender.job_roles) > 0
     assert len(recommender.nsqf_levels) > 0
-    assert hasattr(recommender, 'nn_model')
+    assert recommender.skills_matrix.shape[0] == len(recommender.job_roles)
     assert hasattr(recommender, 'vectorizer')
-    assert recommender.db_path == test_db_path
+    # The shared connection is left open for other tests
+    assert test_db_conn.execute('SELECT COUNT(*) FROM job_roles').fetchone()[0] == len(recommender.job_roles)
 
-def test_skill_normalization():
+@pytest.mark.parametrize("skills,expected", [
+    ([' Python ', 'DATA Analysis', ' Machine Learning '], 
+     ['python', 'data analysis', 'machine learning']),
+    (['SQL', 'NoSQL', 'PostgreSQL'], 
+     ['sql', 'nosql', 'postgresql']),
+    ([], []),  # Empty list
+    ([''], ['']),  # Single empty string
+])
+def test_skill_normalization(recommender, skills, expected):
     """Test that skills are properly normalized."""
-    recommender = HybridRecommender()
-    # Test various cases
-    test_cases = [
-        ([' Python ', 'DATA Analysis', ' Machine Learning '], 
-         ['python', 'data analysis', 'machine learning']),
-        (['SQL', 'NoSQL', 'PostgreSQL'], 
-         ['sql', 'nosql', 'postgresql']),
-        ([], []),  # Empty list
-        ([''], ['']),  # Single empty string
-    ]
-    
-    for skills, expected in test_cases:
-        normalized = recommender._normalize_skills(skills)
-        assert normalized == expected
+    assert recommender._normalize_skills(skills) == expected
 
-def test_empty_skills_handling():
+@pytest.mark.parametrize("skills,expected", [
+    (['', ' ', '  '], []),  # Empty or whitespace-only skills
+    (['', 'Python', '  '], ['python']),  # Mixed empty and valid skills
+    (['Python', '', 'SQL'], ['python', 'sql']),  # Empty in the middle
+])
+def test_empty_skills_handling(recommender, skills, expected):
     """Test that empty skills are handled gracefully."""
-    recommender = HybridRecommender()
-    test_cases = [
-        (['', ' ', '  '], []),  # Empty or whitespace-only skills
-        (['', 'Python', '  '], ['python']),  # Mixed empty and valid skills
-        (['Python', '', 'SQL'], ['python', 'sql']),  # Empty in the middle
-    ]
-    
-    for skills, expected in test_cases:
-        normalized = recommender._normalize_skills(skills)
-        assert normalized == expected
+    assert recommender._normalize_skills(skills) == expected
 
-def test_mock_recommendations():
+def test_mock_recommendations(test_db_path):
     """Test recommendations with mocked data."""
     with patch('app.services.recommender.HybridRecommender') as mock_recommender:
         # Setup mock
@@ -67,27 +60,25 @@ def test_mock_recommendations():
             'skills': ['python', 'statistics'],
             'education_level': 'bachelor',
             'learning_pace': 'normal'
-        })
+        }, test_db_path)
         
         # Verify the results
         assert 'recommendations' in result
         assert len(result['recommendations']) > 0
         assert result['recommendations'][0]['job_title'] == 'Mock Data Scientist'
 
-def test_error_handling():
-    """Test that the recommender handles errors gracefully."""
-    # Test with invalid database path
-    with pytest.raises(Exception):
-        recommender = HybridRecommender('/nonexistent/path.db')
-        recommender._load_data()  # This should raise an exception
-    
-    # Test with invalid profile data
-    with pytest.raises(ValueError):
-        compute_recommendations({})  # Empty profile
+def test_invalid_db_path():
+    """Test that an unreachable database path raises when loading data."""
+    with pytest.raises(sqlite3.OperationalError, match="unable to open"):
+        HybridRecommender('/nonexistent/path.db')
 
-def test_recommendation_structure(sample_profile, test_db_path):
+def test_empty_profile_raises(test_db_path):
+    """Test that a profile without skills is rejected."""
+    with pytest.raises(ValueError, match="profile"):
+        compute_recommendations({}, test_db_path)  # Empty profile
+
+def test_recommendation_structure(sample_profile, recommender):
     """Test that recommendations have the expected structure."""
-    recommender = HybridRecommender(test_db_path)
     result = recommender.get_recommendations(sample_profile)
     
     # Check top-level structure
@@ -109,9 +100,9 @@ def test_recommendation_structure(sample_profile, test_db_path):
             assert isinstance(step['duration_weeks'], int)
             assert step['duration_weeks'] > 0
 
-def test_compute_recommendations(sample_profile, test_db_path):
+def test_compute_recommendations(sample_profile, recommender):
     """Test that recommendations are generated correctly."""
-    recommendations = compute_recommendations(sample_profile, test_db_path)
+    recommendations = recommender.compute_recommendations(sample_profile)
     
     # Basic structure checks
     assert 'recommendations' in recommendations
@@ -153,3 +144,14 @@ def test_learning_pace_adjustment(test_db_path, sample_profile):
     
     # Fast pace should have shorter duration than slow pace
     assert fast_duration < slow_duration
+
+def test_compute_batch_matches_single(recommender, sample_profile):
+    """Test that batched recommendations match per-profile computation."""
+    fast_profile = dict(sample_profile, learning_pace='fast')
+    
+    batch = recommender.compute_batch([sample_profile, fast_profile])
+    
+    assert batch == [
+        recommender.compute_recommendations(sample_profile),
+        recommender.compute_recommendations(fast_profile)
+    ]
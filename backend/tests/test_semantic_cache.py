@@ -0,0 +1,31 @@
+from app.services.semantic_cache import SemanticCache
+
+def test_semantic_cache_hit_on_equivalent_message():
+    """Test that a rephrased-but-equivalent message hits the cache."""
+    cache = SemanticCache()
+    context_hash = cache.context_hash({'profile': {'education_level': 4}})
+    cache.set(1, cache.embed('What should I learn next?'), context_hash, 'Learn SQL')
+
+    assert cache.get(1, cache.embed('what should I learn next'), context_hash) == 'Learn SQL'
+    assert cache.stats['hits'] == 1
+
+def test_semantic_cache_requires_matching_context_and_partition():
+    """Test that different contexts or profiles never share entries."""
+    cache = SemanticCache()
+    context_hash = cache.context_hash({'profile': {'education_level': 4}})
+    other_hash = cache.context_hash({'profile': {'education_level': 5}})
+    cache.set(1, cache.embed('What should I learn next?'), context_hash, 'Learn SQL')
+
+    assert cache.get(1, cache.embed('What should I learn next?'), other_hash) is None
+    assert cache.get(2, cache.embed('What should I learn next?'), context_hash) is None
+    assert cache.get(1, cache.embed('How long does a diploma take?'), context_hash) is None
+
+def test_semantic_cache_grows_and_evicts_oldest():
+    """Test that appends past capacity keep entries and evict the oldest first."""
+    cache = SemanticCache(max_entries=20)
+    context_hash = cache.context_hash({})
+    for i in range(25):
+        cache.set(1, cache.embed(f'question number {i} about topic{i}'), context_hash, str(i))
+
+    assert cache.get(1, cache.embed('question number 24 about topic24'), context_hash) == '24'
+    assert cache.get(1, cache.embed('question number 0 about topic0'), context_hash) is None